@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 import os
 import argparse
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import re
 import yaml
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import functions from the different modules
+from scripts.ingestion._common import DOWNLOAD_MANIFEST, HASH_ALGO, new_hasher
 from scripts.ingestion.s3_downloader import download_files_from_s3
 from scripts.ingestion.s3_uploader import (
     upload_to_bronze_layer,
@@ -45,50 +53,166 @@ def create_directories(directories):
         logger.info(f"Created directory: {directory}")
 
 
-def run_trino_queries(query_file, host, port, user, catalog, schema, output_dir):
-    """Execute Trino queries from a file and return the last result"""
-    # Read queries from file
-    with open("/home/cortica/2nd_degree/work_search_projects/spotify_project_py/scripts/sql/queries.sql", 'r') as f:
-        sql_content = f.read()
-    #sql_content = "/home/cortica/2nd_degree/work_search_projects/spotify_project_py/scripts/sql/queries.sql"
-    queries = split_sql_queries(sql_content)
+@functools.lru_cache(maxsize=4)
+def load_queries(query_file):
+    """Read and split a SQL file once; repeated runs reuse the parsed queries"""
+    with open(query_file, 'r') as f:
+        return tuple(split_sql_queries(f.read()))
 
-    # Execute each query
-    last_result = None
-    for i, query in enumerate(queries, 1):
-        logger.info(f"Executing Query {i}:\n{query}")
-        try:
-            results_df = execute_trino_query(
+
+# Functions whose result changes between executions; queries using them are never cached
+NON_DETERMINISTIC_SQL = re.compile(
+    r"\b(now|rand|random|uuid|shuffle|current_date|current_time|current_timestamp|"
+    r"localtime|localtimestamp)\b",
+    re.IGNORECASE
+)
+
+
+def is_cacheable_query(query):
+    """Only deterministic read-only queries may be served from the result cache"""
+    return (query.lstrip().upper().startswith(("SELECT", "WITH"))
+            and not NON_DETERMINISTIC_SQL.search(query))
+
+
+def input_fingerprint(bronze_dir):
+    """Fingerprint the raw Bronze inputs of a run from its download manifest
+
+    The manifest already holds the hash of every extracted member and the checksums S3
+    reported, so the data itself is not read again. A downloaded file with neither (other
+    than the zip, which its members cover) is hashed directly.
+
+    Args:
+        bronze_dir: Directory the Bronze files were downloaded to
+
+    Returns:
+        str: Hex digest, or None if the directory has no download manifest
+    """
+    manifest_path = os.path.join(bronze_dir or "", DOWNLOAD_MANIFEST)
+    if not os.path.isfile(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    digest = hashlib.sha256()
+    for name, info in sorted(manifest.get("extracted_files", {}).items()):
+        digest.update(f"{name}\0{info['hash_algo']}:{info['hash']}\n".encode())
+    for name, checksums in sorted(manifest.get("s3_checksums", {}).items()):
+        if checksums:
+            digest.update(f"{name}\0{json.dumps(checksums, sort_keys=True)}\n".encode())
+        elif not name.endswith('.zip'):
+            hasher = new_hasher()
+            with open(os.path.join(bronze_dir, name), 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+            digest.update(f"{name}\0{HASH_ALGO}:{hasher.hexdigest()}\n".encode())
+    return digest.hexdigest()
+
+
+async def run_trino_queries(query_file, host, port, user, catalog, schema, output_dir,
+                            cache_dir=None, bronze_dir=None):
+    """Execute Trino queries from a file concurrently and return the last result
+
+    When cache_dir and bronze_dir are given, results of deterministic SELECT queries are
+    cached under cache_dir, keyed by the query text and the run's raw Bronze inputs, so
+    re-runs over the same source data skip the round trip to Trino.
+    """
+    queries = load_queries(query_file)
+
+    # Submit every query at once; execute_trino_query reuses one pooled connection per
+    # worker thread, since Trino DB-API connections must not be shared between threads
+    loop = asyncio.get_running_loop()
+
+    fingerprint = None
+    if cache_dir:
+        fingerprint = await asyncio.to_thread(input_fingerprint, bronze_dir)
+        if fingerprint:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    async def run_query(i, query, executor):
+        cache_file = None
+        if fingerprint and is_cacheable_query(query):
+            key = hashlib.sha256(f"{catalog}.{schema}\n{query}\n{fingerprint}".encode()).hexdigest()
+            cache_file = os.path.join(cache_dir, f"{key}.csv")
+
+        if cache_file and os.path.exists(cache_file):
+            logger.info(f"Query {i} served from result cache")
+            results_df = await asyncio.to_thread(pd.read_csv, cache_file)
+        else:
+            logger.info(f"Executing Query {i}:\n{query}")
+            results_df = await loop.run_in_executor(executor, functools.partial(
+                execute_trino_query,
                 host=host,
                 port=port,
                 user=user,
                 catalog=catalog,
                 schema=schema,
                 sql_query=query
-            )
-
+            ))
             logger.info(f"Query {i} executed successfully")
+            if results_df is None:
+                # DDL and other statements without a result set have nothing to save
+                return None
+            if cache_file:
+                await asyncio.to_thread(results_df.to_csv, cache_file, index=False)
+
+        # Save to file off the event loop so the write overlaps with the remaining queries
+        output_file = os.path.join(output_dir, f"query_result_{i}.csv")
+        await asyncio.to_thread(results_df.to_csv, output_file, index=False)
+        logger.info(f"Results saved to {output_file}")
+        return results_df
+
+    with ThreadPoolExecutor(max_workers=max(len(queries), 1)) as executor:
+        results = await asyncio.gather(
+            *(run_query(i, query, executor) for i, query in enumerate(queries, 1)),
+            return_exceptions=True
+        )
 
-            # Save to file
-            output_file = os.path.join(output_dir, f"query_result_{i}.csv")
-            results_df.to_csv(output_file, index=False)
-            logger.info(f"Results saved to {output_file}")
+    last_result = None
+    for i, results_df in enumerate(results, 1):
+        if isinstance(results_df, Exception):
+            logger.error(f"Error executing Query {i}: {str(results_df)}")
+            continue
 
-            # Keep track of the last result
-            last_result = results_df
+        if results_df is None:
+            continue
 
-            # Save the last query result to a specific file for the next stage
-            if i == len(queries):
-                final_output = os.path.join(output_dir, "final_query_result.csv")
-                results_df.to_csv(final_output, index=False)
-                logger.info(f"Final query result saved to {final_output}")
+        # Keep track of the last result
+        last_result = results_df
 
-        except Exception as e:
-            logger.error(f"Error executing Query {i}: {str(e)}")
+        # Save the last query result to a specific file for the next stage
+        if i == len(queries):
+            final_output = os.path.join(output_dir, "final_query_result.csv")
+            await asyncio.to_thread(results_df.to_csv, final_output, index=False)
+            logger.info(f"Final query result saved to {final_output}")
 
     return last_result
 
 
+async def upload_and_convert_cleaned_data(config, cleaned_dir, parquet_dir):
+    """Run the Silver layer upload (network-bound) and parquet conversion (CPU-bound) concurrently
+
+    Returns the Arrow schema of the written parquet data, or None if nothing was written.
+    """
+    _, conversion = await asyncio.gather(
+        asyncio.to_thread(
+            upload_to_silver_layer,
+            source_dir=cleaned_dir,
+            bucket=config['s3']['silver_bucket'],
+            prefix=config['s3']['silver_prefix'],
+            file_pattern="*.parquet"
+        ),
+        asyncio.to_thread(
+            convert_to_formats,
+            input_dir=cleaned_dir,
+            output_dir=parquet_dir,
+            formats=["parquet"],  # Only convert to parquet in this step
+            silver_bucket=config['s3']['silver_bucket'],
+            silver_prefix=config['s3']['silver_prefix']
+        )
+    )
+    return conversion.get('parquet_schema')
+
+
 def main():
     parser = argparse.ArgumentParser(description="Spotify Data Pipeline")
     parser.add_argument("--config", default="configs/config.yaml", help="Path to configuration file")
@@ -96,7 +220,7 @@ def main():
                         help="Run all steps or single steps")
     parser.add_argument("--formats", nargs="+", default=["parquet", "csv"],
                         help="Output formats for conversion")
-    parser.add_argument("--query-file", default="sql/queries.sql", help="SQL query file for Trino queries")
+    parser.add_argument("--query-file", default="scripts/sql/queries.sql", help="SQL query file for Trino queries")
     args = parser.parse_args()
 
     # Load configuration
@@ -148,30 +272,17 @@ def main():
         clean_data(parsed_dir, cleaned_dir, combined_output=True)
         logger.info("Data cleaning completed")
 
-        # STEP 4: Upload new data to S3 Silver layer
+        # STEP 4 + STEP 5: Upload cleaned data to the Silver layer while converting it to parquet;
+        # both only read the cleaned files, so they run side by side
         logger.info("STEP 4: Uploading cleaned data to S3 Silver layer")
-        upload_to_silver_layer(
-            source_dir=cleaned_dir,
-            bucket=config['s3']['silver_bucket'],
-            prefix=config['s3']['silver_prefix'],
-            file_pattern="*.csv"
-        )
-        logger.info("Silver layer upload completed")
-
-        # STEP 5: Convert cleaned data to parquet
         logger.info("STEP 5: Converting cleaned data to parquet")
-        convert_to_formats(
-            input_dir=cleaned_dir,
-            output_dir=parquet_dir,
-            formats=["parquet"],  # Only convert to parquet in this step
-            silver_bucket=config['s3']['silver_bucket'],
-            silver_prefix=config['s3']['silver_prefix']
-        )
-        logger.info("Parquet conversion completed")
+        parquet_schema = asyncio.run(upload_and_convert_cleaned_data(config, cleaned_dir, parquet_dir))
+        logger.info("Silver layer upload and parquet conversion completed")
 
         # STEP 6: Setup Trino server
         logger.info("STEP 6: Setting up Trino server")
-        trino_config = setup_local_trino_for_parquet(parquet_dir)
+        # The converter's schema lets the table be defined without reading the parquet footers
+        trino_config = setup_local_trino_for_parquet(parquet_dir, arrow_schema=parquet_schema)
         logger.info("Trino server setup completed")
 
         # STEP 7: Run queries on Trino server
@@ -187,22 +298,24 @@ def main():
                 'schema': 'default'
             }
 
-        run_trino_queries(
+        asyncio.run(run_trino_queries(
             query_file=args.query_file,
             host=trino_config.get('host', 'localhost'),
             port=trino_config.get('port', 8080),
             user=trino_config.get('user', 'trino'),
             catalog=trino_config.get('catalog', 'hive'),
             schema=trino_config.get('schema', 'default'),
-            output_dir=query_results_dir
-        )
+            output_dir=query_results_dir,
+            cache_dir=os.path.join(temp_dir, "query_cache"),
+            bronze_dir=bronze_dir
+        ))
         logger.info("Trino queries completed")
 
         # STEP 8: Combine parsed XML(csv) data with new csv
         logger.info("STEP 8: Combining parsed XML data with query results")
         podcast_data = os.path.join(cleaned_dir, "podcasts_combined.csv")
         query_data = os.path.join(query_results_dir, "final_query_result.csv")
-        combined_data_path = os.path.join(combined_dir, "combined_data.csv")
+        combined_data_path = os.path.join(combined_dir, "combined_data.parquet")
 
         combine_csvs(
             podcast_csv=podcast_data,
@@ -1,111 +1,190 @@
 import os
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import re
+
+# Numeric columns of the combined data; float64 because unmatched episodes carry nulls
+NUMERIC_DTYPES = {
+    "duration_seconds": "float64",
+    "listens": "float64",
+    "likes": "float64",
+    "searches": "float64",
+}
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+# Figure/Axes pair reused by every chart a worker process renders
+_FIGURE = None
+
+
+def _plot_bar(data, x, y, palette, title, output_path, xlabel=None, ylabel=None):
+    """
+    Render a single bar chart to a PNG file.
+
+    Runs in a worker process, so pyplot's global figure state is never shared. The
+    figure is created once per process and cleared between charts.
+
+    Args:
+        data (dict): Column name -> list of values
+        x (str): Column plotted on the x axis
+        y (str): Column plotted on the y axis
+        palette (str): Seaborn palette name
+        title (str): Chart title
+        output_path (str): Path of the PNG file to write
+        xlabel (str): Optional x axis label
+        ylabel (str): Optional y axis label
+    """
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = plt.subplots(figsize=(10, 6))
+    fig, ax = _FIGURE
+
+    ax.clear()
+    sns.barplot(data=pd.DataFrame(data), x=x, y=y, palette=palette, ax=ax)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(output_path)
+
+
+def _write_csv(frame, output_path):
+    """
+    Write a small result frame as CSV (no index column).
+
+    Written by pandas so the Gold files keep their exact format: only fields that need
+    it are quoted and float counts keep their decimal point ("19.0"). The frames hold at
+    most 24 rows, so the pyarrow writer would save nothing measurable.
+    """
+    frame.to_csv(output_path, index=False)
+
 
 def analyze_podcasts(input_csv, output_dir):
 
 
     os.makedirs(output_dir, exist_ok=True)
 
-    # Load data
-    df = pd.read_csv(input_csv)
+    # Load data (CSV with the multithreaded pyarrow parser); numeric columns are cast
+    # afterwards, since passing dtype to the pyarrow parser fails on some pandas versions
+    if input_csv.endswith(".parquet"):
+        df = pd.read_parquet(input_csv)
+    else:
+        df = pd.read_csv(input_csv, engine="pyarrow")
+    df = df.astype(NUMERIC_DTYPES)
     df["pub_date"] = pd.to_datetime(df["pub_date"], errors="coerce")
 
     # Remove rows with invalid or missing pub_date
     df = df[df["pub_date"].notna()]
 
-    df["duration_seconds"] = pd.to_numeric(df["duration_seconds"], errors="coerce")
-    df.fillna(0, inplace=True)
-
-    # extract MamraMic#number format
-    def extract_mamramic( title):
-        match = re.search(r'(MamraMic#\d+)',title)
-        return match.group(1) if match else title
-
-    # Create a new column with the extracted format
-    df['display_title'] = df['title'].apply(extract_mamramic)
-
-    # Most Listen
-    top_listens = df.sort_values("listens",ascending=False)[["title", "display_title", "listens"]].head(10)
-    top_listens.to_csv(f"{output_dir}/top_listens.csv",index=False)
-
-    plt.figure(figsize=(10, 6))
-    sns.barplot(data=top_listens,x="listens", y="display_title",palette="Blues_d")
-    plt.title("Top 10 Most Listened Podcasts")
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/most_listened.png")
-    plt.close()
-
-   #likes
-    top_likes = df.sort_values("likes",ascending=False)[["title", "display_title","likes"]].head(10)
-    top_likes.to_csv(f"{output_dir}/top_likes.csv",index=False)
-
-    plt.figure(figsize=(10,6))
-    sns.barplot(data=top_likes,x="likes",y="display_title",palette="Greens_d")
-    plt.title("Top 10 Most Liked Podcasts")
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/most_liked.png")
-    plt.close()
-
-    #  Searched podcasts
-    top_searches = df.sort_values("searches", ascending=False)[["title", "display_title", "searches"]].head(10)
-    top_searches.to_csv(f"{output_dir}/top_searches.csv", index=False)
-
-    plt.figure(figsize=(10, 6))
-    sns.barplot(data=top_searches, x="searches", y="display_title", palette="Oranges_d")
-    plt.title("Top 10 Most Searched Podcasts")
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/most_searched.png")
-    plt.close()
-
-    # time of release Frequency
-    df_sorted = df.sort_values("pub_date")
-    release_diffs = df_sorted["pub_date"].diff().dt.days.dropna()
-    avg_release_gap = release_diffs.mean()
-    with open(f"{output_dir}/release_frequency.txt","w") as f:
-        f.write(f"Average number days between releases: {avg_release_gap:.2f}\n")
-
-    # shortest longest average
-    shortest = df.loc[df["duration_seconds"].idxmin()]
-    longest = df.loc[df["duration_seconds"].idxmax()]
-    average_duration = df["duration_seconds"].mean()
-    median_duration = df["duration_seconds"].median()
-
-    with open(f"{output_dir}/duration_stats.txt", "w") as f:
-        f.write(f"Shortest podcast: {shortest['title']} ({shortest['duration_seconds']}s)\n")
-        f.write(f"Longest podcast: {longest['title']} ({longest['duration_seconds']}s)\n")
-        f.write(f"Average duration: {average_duration:.2f}s\n")
-        f.write(f"Median duration: {median_duration:.2f}s\n")
-
-
-
-    # Peak listening hour
-    df["pub_hour"] = df["pub_date"].dt.hour
-    hour_counts = df.groupby("pub_hour")["listens"].sum().sort_values(ascending=False)
-    peak_hour = hour_counts.idxmax()
-
-    hour_counts.to_csv(f"{output_dir}/listens_by_hour.csv")
-    with open(f"{output_dir}/peak_hour.txt", "w") as f:
-        f.write(f"Peak hour for podcast listening:{peak_hour}:00\n")
-
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x=hour_counts.index,y=hour_counts.values, palette="Purples_d")
-    plt.xlabel("Hour of Day")
-    plt.ylabel("Total Listens")
-    plt.title("Listening Activity by Hour")
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/listening_by_hour.png")
-    plt.close()
+    # Only the numeric columns default to 0; text columns keep their missing values
+    numeric_columns = list(NUMERIC_DTYPES)
+    df[numeric_columns] = df[numeric_columns].fillna(0)
+
+    # Create a new column with the extracted MamraMic#number format
+    df['display_title'] = df['title'].str.extract(r'(MamraMic#\d+)', expand=False).fillna(df['title'])
+
+    # Narrow frame shared by the three top-10 selections
+    metrics = df[["title", "display_title", "listens", "likes", "searches"]]
+
+    # Charts render in background processes while the CSV/text outputs are written;
+    # spawn keeps the workers clean even if the caller already runs threads
+    plot_workers = min(4, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=plot_workers, mp_context=multiprocessing.get_context("spawn")) as plot_pool:
+        plots = []
+        text_outputs = {}
+
+        # Most Listen
+        top_listens = metrics.nlargest(10, "listens")[["title", "display_title", "listens"]]
+        _write_csv(top_listens, f"{output_dir}/top_listens.csv")
+
+        plots.append(plot_pool.submit(
+            _plot_bar, top_listens.to_dict("list"), "listens", "display_title", "Blues_d",
+            "Top 10 Most Listened Podcasts", f"{output_dir}/most_listened.png"
+        ))
+
+       #likes
+        top_likes = metrics.nlargest(10, "likes")[["title", "display_title","likes"]]
+        _write_csv(top_likes, f"{output_dir}/top_likes.csv")
+
+        plots.append(plot_pool.submit(
+            _plot_bar, top_likes.to_dict("list"), "likes", "display_title", "Greens_d",
+            "Top 10 Most Liked Podcasts", f"{output_dir}/most_liked.png"
+        ))
+
+        #  Searched podcasts
+        top_searches = metrics.nlargest(10, "searches")[["title", "display_title", "searches"]]
+        _write_csv(top_searches, f"{output_dir}/top_searches.csv")
+
+        plots.append(plot_pool.submit(
+            _plot_bar, top_searches.to_dict("list"), "searches", "display_title", "Oranges_d",
+            "Top 10 Most Searched Podcasts", f"{output_dir}/most_searched.png"
+        ))
+
+        # time of release Frequency
+        pub_ns = np.sort(df["pub_date"].values.astype("datetime64[ns]").view("i8"))
+        # Floor to whole days per gap, matching Timedelta.days
+        avg_release_gap = (np.diff(pub_ns) // NS_PER_DAY).mean() if len(pub_ns) > 1 else float("nan")
+        text_outputs["release_frequency.txt"] = f"Average number days between releases: {avg_release_gap:.2f}\n"
+
+        # shortest longest average, all from one contiguous float64 array
+        durations = df["duration_seconds"].to_numpy(dtype="float64")
+        shortest = df.iloc[durations.argmin()]
+        longest = df.iloc[durations.argmax()]
+        average_duration = durations.mean()
+        median_duration = np.median(durations)
+
+        text_outputs["duration_stats.txt"] = (
+            f"Shortest podcast: {shortest['title']} ({shortest['duration_seconds']}s)\n"
+            f"Longest podcast: {longest['title']} ({longest['duration_seconds']}s)\n"
+            f"Average duration: {average_duration:.2f}s\n"
+            f"Median duration: {median_duration:.2f}s\n"
+        )
+
+
+
+        # Peak listening hour
+        # Hours fall in [0, 23], so a weighted bincount replaces the groupby hash table
+        hours = df["pub_date"].dt.hour.to_numpy()
+        listens_sum = np.bincount(hours, weights=df["listens"].to_numpy(), minlength=24)
+        present_hours = np.flatnonzero(np.bincount(hours, minlength=24))
+        present_hours = present_hours[np.argsort(-listens_sum[present_hours], kind="stable")]
+        hour_counts = pd.Series(listens_sum[present_hours], index=pd.Index(present_hours, name="pub_hour"),
+                                name="listens")
+        peak_hour = hour_counts.idxmax()
+
+        _write_csv(hour_counts.reset_index(), f"{output_dir}/listens_by_hour.csv")
+        text_outputs["peak_hour.txt"] = f"Peak hour for podcast listening:{peak_hour}:00\n"
+
+        # Each text report is written in one call once all stats are known
+        for name, text in text_outputs.items():
+            Path(output_dir, name).write_text(text)
+
+        plots.append(plot_pool.submit(
+            _plot_bar,
+            {"pub_hour": hour_counts.index.tolist(), "listens": hour_counts.values.tolist()},
+            "pub_hour", "listens", "Purples_d",
+            "Listening Activity by Hour", f"{output_dir}/listening_by_hour.png",
+            xlabel="Hour of Day", ylabel="Total Listens"
+        ))
+
+        # Surface any rendering error
+        for plot in plots:
+            plot.result()
 
     print(f"✅ Analysis complete. All results saved to: {output_dir}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze podcast CSV data and generate stats + visuals.")
-    parser.add_argument("--input", "-i", required=True, help="Path to the input CSV file")
+    parser.add_argument("--input", "-i", required=True, help="Path to the input CSV or parquet file")
     parser.add_argument("--output", "-o", required=True, help="Output directory to save results")
     args = parser.parse_args()
 
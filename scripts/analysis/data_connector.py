@@ -1,5 +1,8 @@
 import argparse
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 
 def combine_csvs(podcast_csv, stats_csv, output_csv):
@@ -9,21 +12,43 @@ def combine_csvs(podcast_csv, stats_csv, output_csv):
     Args:
         podcast_csv (str): Path to the podcast metadata CSV file
         stats_csv (str): Path to the statistics CSV file
-        output_csv (str): Path for the output combined CSV file
+        output_csv (str): Path for the output combined file (.parquet for parquet, otherwise CSV)
     """
     try:
-        # Read both CSV files
-        podcast_df = pd.read_csv(podcast_csv)
-        stats_df = pd.read_csv(stats_csv)
+        # Read both CSV files straight into Arrow tables
+        podcast_table = pacsv.read_csv(podcast_csv)
+        stats_table = pacsv.read_csv(stats_csv)
 
         # Rename episode_id to episode_number in stats for consistent merging
-        stats_df = stats_df.rename(columns={'episode_id': 'episode_number'})
+        stats_table = stats_table.rename_columns(
+            ['episode_number' if name == 'episode_id' else name for name in stats_table.column_names]
+        )
 
-        # Merge the dataframes on episode_number
-        combined_df = pd.merge(podcast_df, stats_df, on='episode_number', how='left')
+        # Join keys must share a type; align the stats key with the podcast key
+        key_type = podcast_table.schema.field('episode_number').type
+        key_index = stats_table.schema.get_field_index('episode_number')
+        stats_table = stats_table.set_column(
+            key_index, 'episode_number', pc.cast(stats_table.column(key_index), key_type, safe=False)
+        )
 
-        # Save the combined dataframe to a new CSV file
-        combined_df.to_csv(output_csv, index=False)
+        # Left join on episode_number, keeping the podcast row order like pd.merge(how='left')
+        podcast_table = podcast_table.append_column(
+            '__row_order', pa.array(range(podcast_table.num_rows), type=pa.int64())
+        )
+        combined_table = podcast_table.join(
+            stats_table, keys='episode_number', join_type='left outer',
+            left_suffix='_x', right_suffix='_y'
+        )
+        combined_table = combined_table.sort_by('__row_order')
+        combined_table = combined_table.select(
+            [name for name in combined_table.column_names if name != '__row_order']
+        )
+
+        # Save the combined table; parquet keeps the column types for the next stage
+        if output_csv.endswith('.parquet'):
+            pq.write_table(combined_table, output_csv, compression='zstd')
+        else:
+            pacsv.write_csv(combined_table, output_csv)
 
         print(f"Successfully combined files. Output saved to {output_csv}")
 
@@ -38,7 +63,7 @@ if __name__ == "__main__":
     # Add arguments
     parser.add_argument('--podcast', required=True, help='Path to podcast metadata CSV file')
     parser.add_argument('--stats', required=True, help='Path to statistics CSV file')
-    parser.add_argument('--output', required=True, help='Path for output combined CSV file')
+    parser.add_argument('--output', required=True, help='Path for output combined file (.parquet or .csv)')
 
     # Parse arguments
     args = parser.parse_args()
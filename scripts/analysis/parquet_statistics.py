@@ -1,35 +1,42 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
 import argparse
 
 
 def process_parquet_to_csv(input_file, output_file):
-    # Read the Parquet file
-    df = pd.read_parquet(input_file)
-
-    # Group by episode_id and action, then count occurrences
-    action_counts = df.groupby(['episode_id', 'action']).size().unstack(fill_value=0)
-
-    # Ensure all required action columns exist (likes, listens, searches)
-    for action in ['like', 'listen', 'search']:
-        if action not in action_counts.columns:
-            action_counts[action] = 0
-
-    # Rename columns to match the required output
-    action_counts = action_counts.rename(columns={
-        'like': 'likes',
-        'listen': 'listens',
-        'search': 'searches'
-    })
+    # Read only the columns needed for the aggregation
+    table = pq.read_table(input_file, columns=['episode_id', 'action'])
+    table = table.filter(pc.is_valid(table['episode_id']))
+
+    # Cleaned data stores action dictionary-encoded; compare on plain strings
+    if pa.types.is_dictionary(table.schema.field('action').type):
+        table = table.set_column(table.schema.get_field_index('action'), 'action',
+                                 table['action'].cast(pa.string()))
+
+    # One 0/1 column per required action (likes, listens, searches)
+    action_columns = {'like': 'likes', 'listen': 'listens', 'search': 'searches'}
+    for action, column in action_columns.items():
+        table = table.append_column(column, pc.cast(pc.equal(table['action'], action).fill_null(False), pa.int64()))
+
+    # Group by episode_id and sum the indicators to count occurrences
+    counts = table.group_by('episode_id').aggregate(
+        [(column, 'sum') for column in action_columns.values()]
+    )
+    counts = counts.rename_columns(
+        [name[:-len('_sum')] if name.endswith('_sum') else name for name in counts.column_names]
+    ).sort_by('episode_id')
 
     # Calculate total actions
-    action_counts['total_actions'] = action_counts['likes'] + action_counts['listens'] + action_counts['searches']
+    total = pc.add(pc.add(counts['likes'], counts['listens']), counts['searches'])
+    counts = counts.append_column('total_actions', total)
 
     # Reorder columns to match the required output
-    action_counts = action_counts[['likes', 'listens', 'searches', 'total_actions']].reset_index()
+    action_counts = counts.select(['episode_id', 'likes', 'listens', 'searches', 'total_actions'])
 
     # Save to CSV
-    action_counts.to_csv(output_file, index=False)
+    pacsv.write_csv(action_counts, output_file, write_options=pacsv.WriteOptions(include_header=True))
     print(f"Successfully processed data and saved to {output_file}")
 
 
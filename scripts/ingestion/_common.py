@@ -0,0 +1,122 @@
+"""
+Ingestion Common Module
+
+Shared configuration, S3 client and logging helpers for the ingestion
+modules (s3_downloader, s3_uploader, data_validator).
+"""
+
+import functools
+import hashlib
+import logging
+import os
+
+from scripts.ingestion._yaml_cache import load_yaml
+
+logger = logging.getLogger(__name__)
+
+# Integrity hashes are not security sensitive; BLAKE3 is several times faster than MD5
+try:
+    import blake3
+
+    BLAKE3_AVAILABLE = True
+    HASH_ALGO = "blake3"
+except ImportError:
+    BLAKE3_AVAILABLE = False
+    HASH_ALGO = "md5"
+    logger.warning("blake3 library not found. Falling back to md5 for file hashes.")
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+# Resolved once at import; SPOTIFY_CREDENTIALS overrides the in-repo template
+CREDENTIALS_PATH = os.path.normpath(
+    os.environ.get('SPOTIFY_CREDENTIALS', os.path.join(PROJECT_ROOT, 'configs', 'credentials.yaml'))
+)
+
+# Written next to the downloaded files by s3_downloader; read by data_validator
+DOWNLOAD_MANIFEST = "download_manifest.json"
+
+# Checksums S3 may return for an object, strongest/fastest first
+S3_CHECKSUM_FIELDS = ('ChecksumCRC32C', 'ChecksumCRC32', 'ChecksumSHA256', 'ChecksumSHA1')
+
+
+def new_hasher():
+    """
+    Create an incremental hasher for file integrity fingerprints
+
+    Returns:
+        object: hashlib-style hasher for HASH_ALGO
+    """
+    if BLAKE3_AVAILABLE:
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.md5()
+
+
+def configure_logging():
+    """
+    Configure root logging for a module run as a standalone script
+
+    Library imports leave logging alone so the caller's configuration wins.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+    )
+
+
+def load_config(config_path):
+    """
+    Load configuration from YAML file
+
+    Args:
+        config_path: Path to config YAML file
+
+    Returns:
+        dict: Configuration values
+    """
+    try:
+        config = load_yaml(config_path)
+        logger.info(f"Loaded configuration from {config_path}")
+        return config
+    except Exception as e:
+        logger.error(f"Error loading configuration: {e}")
+        raise
+
+
+@functools.lru_cache(maxsize=8)
+def get_s3_client(credentials_path):
+    """
+    Create S3 client using credentials from YAML file
+
+    Clients are cached per credentials path, so repeated calls share one
+    connection pool.
+
+    Args:
+        credentials_path: Path to credentials YAML file
+
+    Returns:
+        boto3.client: Configured S3 client
+    """
+    # boto3 is only needed by the transfer modules, not by the validator
+    import boto3
+    from botocore.config import Config
+
+    try:
+        credentials = load_yaml(credentials_path)
+
+        s3_client = boto3.client(
+            's3',
+            aws_access_key_id=credentials['aws']['access_key_id'],
+            aws_secret_access_key=credentials['aws']['secret_access_key'],
+            region_name=credentials['aws']['region'],
+            # Enough pooled connections for the parallel transfers, with adaptive retries
+            config=Config(
+                max_pool_connections=32,
+                retries={'mode': 'adaptive', 'max_attempts': 10},
+                tcp_keepalive=True
+            )
+        )
+        logger.info("Successfully created S3 client")
+        return s3_client
+    except Exception as e:
+        logger.error(f"Error creating S3 client: {e}")
+        raise
@@ -0,0 +1,50 @@
+"""
+YAML Cache Module
+
+Shared helper for the ingestion modules that parses each YAML file once per
+process and re-parses it only when the file changes on disk.
+"""
+
+import copy
+import functools
+import logging
+import os
+import yaml
+
+logger = logging.getLogger(__name__)
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+    logger.warning("libyaml bindings not found. Falling back to the pure-Python YAML loader.")
+
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_cached(path, mtime_ns):
+    """
+    Parse a YAML file; cached per (path, modification time)
+
+    Args:
+        path: Absolute path to the YAML file
+        mtime_ns: Modification time of the file, part of the cache key only
+
+    Returns:
+        dict: Parsed YAML content
+    """
+    with open(path, 'r') as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
+def load_yaml(path):
+    """
+    Load a YAML file, reusing the parsed result while the file is unchanged
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        dict: Parsed YAML content (a copy callers may modify freely)
+    """
+    abs_path = os.path.abspath(path)
+    return copy.deepcopy(_load_yaml_cached(abs_path, os.stat(abs_path).st_mtime_ns))
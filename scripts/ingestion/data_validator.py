@@ -6,76 +6,217 @@ It performs checks on file integrity, format, and content.
 """
 
 import os
+import csv
 import logging
-import yaml
-import pandas as pd
-import xml.etree.ElementTree as ET
 import json
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+from scripts.ingestion._common import (
+    BLAKE3_AVAILABLE,
+    DOWNLOAD_MANIFEST,
+    HASH_ALGO,
+    S3_CHECKSUM_FIELDS,
+    configure_logging,
+    load_config,
+    new_hasher
 )
+
 logger = logging.getLogger(__name__)
 
+# orjson serializes the report much faster than the stdlib encoder
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson library not found. Falling back to json for validation reports.")
+
+# Prefer lxml's C parser for streaming, fall back to the standard library
+try:
+    from lxml import etree
+
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+    LXML_AVAILABLE = False
+    logger.warning("lxml library not found. Falling back to xml.etree for XML validation.")
+
+# Sidecar next to the report holding per-file results keyed by stat fingerprint
+VALIDATION_CACHE = ".validation_cache.json"
+
 
-def load_config(config_path):
+def dump_json(data):
     """
-    Load configuration from YAML file
+    Serialize data to indented JSON bytes
 
     Args:
-        config_path: Path to config YAML file
+        data: JSON-serializable object
 
     Returns:
-        dict: Configuration values
+        bytes: UTF-8 encoded JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _file_hash(path):
+    """
+    Compute the integrity hash of a file without reading it into memory at once
+
+    Uses BLAKE3 when available and MD5 otherwise (see HASH_ALGO).
+
+    Args:
+        path: Path to file
+
+    Returns:
+        str: Hex digest
+    """
+    with open(path, 'rb') as f:
+        if not BLAKE3_AVAILABLE and hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'md5').hexdigest()
+        digest = new_hasher()
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _load_validation_cache(cache_path):
+    """
+    Load the per-file results of the previous validation run
+
+    Args:
+        cache_path: Path to the validation cache sidecar
+
+    Returns:
+        dict: "path|size|mtime_ns" -> file info entry, empty when there is none
     """
     try:
-        with open(config_path, 'r') as file:
-            config = yaml.safe_load(file)
-        logger.info(f"Loaded configuration from {config_path}")
-        return config
-    except Exception as e:
-        logger.error(f"Error loading configuration: {e}")
-        raise
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
 
-def check_txt_file_format(file_path):
+def _load_download_manifest(directory):
     """
-    Validate format of a podcast stream txt file
+    Load the manifest s3_downloader writes next to the downloaded files
 
     Args:
-        file_path: Path to txt file
+        directory: Download directory
 
     Returns:
-        tuple: (is_valid, error_message)
+        dict: Manifest content, empty when there is none
     """
     try:
-        # Read the first few lines to check format
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = [next(f) for _ in range(10)]
+        with open(os.path.join(directory, DOWNLOAD_MANIFEST), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _xml_integrity(xml_path, manifest):
+    """
+    Integrity fields for the XML file
+
+    Reuses the checksum S3 returned at download time (see s3_downloader's
+    download manifest) and only hashes the file locally when none is available.
 
-        # Check if file is empty
-        if not lines:
-            return False, "File is empty"
+    Args:
+        xml_path: Path to XML file
+        manifest: Download manifest
 
-        # Check for expected columns (comma-separated values)
-        if not any(',' in line for line in lines):
-            return False, "File doesn't contain comma-separated values"
+    Returns:
+        dict: {"hash": ..., "hash_algo": ...}
+    """
+    checksums = manifest.get("s3_checksums", {}).get(os.path.basename(xml_path), {})
 
-        # Try parsing with pandas to verify structure
-        df = pd.read_csv(file_path, nrows=5)
+    for field in S3_CHECKSUM_FIELDS:
+        if field in checksums:
+            return {"hash": checksums[field], "hash_algo": f"s3-{field[len('Checksum'):].lower()}"}
 
-        # Check for minimum expected columns
-        required_columns = ['stream_id', 'user_id', 'timestamp']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+    return {"hash": _file_hash(xml_path), "hash_algo": HASH_ALGO}
 
-        if missing_columns:
-            return False, f"Missing required columns: {', '.join(missing_columns)}"
 
-        return True, ""
+# Columns every podcast stream txt file must have, as raw header bytes
+REQUIRED_TXT_COLUMNS = (b'stream_id', b'user_id', b'timestamp')
+
+
+def check_txt_header(header):
+    """
+    Validate the raw header line of a podcast stream txt file
+
+    Args:
+        header: First line of the file as bytes
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    # Check if file is empty
+    if not header.strip():
+        return False, "File is empty"
+
+    # Check for expected columns (comma-separated values)
+    if b',' not in header:
+        return False, "File doesn't contain comma-separated values"
+
+    # Check for minimum expected columns
+    columns = header.rstrip(b'\r\n').split(b',')
+    missing_columns = [col.decode() for col in REQUIRED_TXT_COLUMNS if col not in columns]
+
+    if missing_columns:
+        return False, f"Missing required columns: {', '.join(missing_columns)}"
+
+    return True, ""
+
+
+def check_txt_lines(header, sample):
+    """
+    Validate the first two raw lines of a podcast stream txt file
+
+    Args:
+        header: Header line as bytes
+        sample: First data line as bytes (empty if there is none)
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    is_valid, error_msg = check_txt_header(header.removeprefix(b'\xef\xbb\xbf'))
+    if not is_valid:
+        return is_valid, error_msg
+
+    # A data row wider than the header means the structure is broken
+    if sample.strip():
+        header_fields = header.count(b',') + 1
+        sample_fields = len(next(csv.reader([sample.decode('utf-8')])))
+        if sample_fields > header_fields:
+            return False, f"Row has {sample_fields} fields but header has {header_fields}"
+
+    return True, ""
+
+
+def check_txt_file_format(file_path):
+    """
+    Validate format of a podcast stream txt file
+
+    Args:
+        file_path: Path to txt file
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    try:
+        # Only the header line and one data row are read, as raw bytes
+        with open(file_path, 'rb') as f:
+            header = f.readline()
+            sample = f.readline()
+
+        return check_txt_lines(header, sample)
 
     except Exception as e:
         return False, f"Error validating file format: {str(e)}"
@@ -91,37 +232,102 @@ def check_xml_file_validity(xml_path):
     Returns:
         tuple: (is_valid, error_message)
     """
-    try:
-        # Try parsing XML
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
+    essential_elements = ['title', 'description', 'item']
 
-        # Check for RSS root element
-        if root.tag != 'rss':
-            return False, "Not a valid RSS feed (missing RSS root element)"
+    try:
+        # Stream the feed instead of building the whole tree; only the root, the first
+        # channel and that channel's direct children are inspected
+        depth = 0
+        channel = None
+        in_channel = False
+        found = set()
+
+        for event, elem in etree.iterparse(xml_path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                # Check for RSS root element
+                if depth == 1 and elem.tag != 'rss':
+                    return False, "Not a valid RSS feed (missing RSS root element)"
+                if depth == 2 and elem.tag == 'channel' and channel is None:
+                    channel = elem
+                    in_channel = True
+                elif depth == 3 and in_channel and elem.tag in essential_elements:
+                    found.add(elem.tag)
+                    # Every essential element (including an episode) has been seen
+                    if len(found) == len(essential_elements):
+                        break
+            else:
+                depth -= 1
+                if elem is channel:
+                    break
+                # Release processed channel children to keep memory flat
+                if depth == 2 and in_channel:
+                    elem.clear()
+                    channel.remove(elem)
 
         # Check for channel element
-        channel = root.find('channel')
         if channel is None:
             return False, "Missing channel element in RSS feed"
 
-        # Check for essential podcast elements
-        essential_elements = ['title', 'description', 'item']
+        # Check for essential podcast elements (item doubles as the episode check)
         for element in essential_elements:
-            if channel.find(element) is None:
+            if element not in found:
                 return False, f"Missing essential element '{element}' in RSS feed"
 
-        # Check for items (episodes)
-        items = channel.findall('item')
-        if not items:
-            return False, "RSS feed contains no episodes (items)"
-
         return True, ""
 
     except Exception as e:
         return False, f"Error validating XML: {str(e)}"
 
 
+def _validate_one(entry, extracted=None):
+    """
+    Hash and format-check a single txt file
+
+    When the downloader already hashed the file and captured its first lines
+    while extracting it, those results are used and the file is not re-read.
+
+    Args:
+        entry: os.DirEntry of the txt file
+        extracted: Matching "extracted_files" entry of the download manifest (optional)
+
+    Returns:
+        dict: File info entry for the validation report
+    """
+    size_bytes = entry.stat().st_size
+    if (extracted and extracted.get("size_bytes") == size_bytes
+            and extracted.get("hash_algo") == HASH_ALGO):
+        file_info = {
+            "filename": entry.name,
+            "size_bytes": size_bytes,
+            "hash": extracted["hash"],
+            "hash_algo": HASH_ALGO
+        }
+        try:
+            # Header lines are stored latin-1 decoded, which maps back to the exact bytes
+            is_valid, error_msg = check_txt_lines(extracted["header"].encode('latin-1'),
+                                                  extracted["sample"].encode('latin-1'))
+        except Exception as e:
+            is_valid, error_msg = False, f"Error validating file format: {str(e)}"
+    else:
+        file_info = {
+            "filename": entry.name,
+            "size_bytes": size_bytes,
+            "hash": _file_hash(entry.path),
+            "hash_algo": HASH_ALGO
+        }
+
+        # Check file format
+        is_valid, error_msg = check_txt_file_format(entry.path)
+
+    file_info["is_valid"] = is_valid
+
+    if not is_valid:
+        file_info["validation_error"] = error_msg
+
+    return file_info
+
+
 def generate_validation_report(extracted_dir, xml_path, output_dir):
     """
     Generate a validation report for all files
@@ -132,14 +338,17 @@ def generate_validation_report(extracted_dir, xml_path, output_dir):
         output_dir: Directory to save validation report
 
     Returns:
-        str: Path to validation report
+        tuple: (report_path, report) path to the saved report and the report dict
     """
+    manifest = _load_download_manifest(os.path.dirname(xml_path))
+    extracted_files = manifest.get("extracted_files", {})
+
     report = {
-        "validation_time": pd.Timestamp.now().isoformat(),
+        "validation_time": datetime.now(timezone.utc).isoformat(),
         "xml_file": {
             "path": xml_path,
             "size_bytes": os.path.getsize(xml_path),
-            "md5_hash": hashlib.md5(open(xml_path, 'rb').read()).hexdigest()
+            **_xml_integrity(xml_path, manifest)
         },
         "txt_files": [],
         "validation_results": {
@@ -158,28 +367,33 @@ def generate_validation_report(extracted_dir, xml_path, output_dir):
         report["validation_results"]["error_count"] += 1
         report["xml_file"]["validation_error"] = xml_error
 
-    # Validate txt files
-    all_txt_valid = True
-    txt_files = [f for f in os.listdir(extracted_dir) if f.endswith('.txt')]
+    # Validate txt files; hashing and parsing release the GIL, so files are checked in parallel
+    # scandir entries cache their stat results, saving a syscall per file
+    with os.scandir(extracted_dir) as it:
+        txt_entries = [entry for entry in it if entry.name.endswith('.txt') and entry.is_file()]
 
-    for txt_file in txt_files:
-        file_path = os.path.join(extracted_dir, txt_file)
-        file_info = {
-            "filename": txt_file,
-            "size_bytes": os.path.getsize(file_path),
-            "md5_hash": hashlib.md5(open(file_path, 'rb').read()).hexdigest()
-        }
+    # Files whose (path, size, mtime) match the previous run reuse its results
+    cache_path = os.path.join(output_dir, VALIDATION_CACHE)
+    cache = _load_validation_cache(cache_path)
 
-        # Check file format
-        is_valid, error_msg = check_txt_file_format(file_path)
-        file_info["is_valid"] = is_valid
+    def validate_cached(entry):
+        stat = entry.stat()
+        key = f"{entry.path}|{stat.st_size}|{stat.st_mtime_ns}"
+        cached = cache.get(key)
+        if cached is not None and cached.get("hash_algo") == HASH_ALGO:
+            return key, cached
+        return key, _validate_one(entry, extracted_files.get(entry.name))
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        # map keeps the results in the same order as the directory listing
+        results = list(executor.map(validate_cached, txt_entries))
+    report["txt_files"] = [file_info for _, file_info in results]
 
-        if not is_valid:
+    all_txt_valid = True
+    for file_info in report["txt_files"]:
+        if not file_info["is_valid"]:
             all_txt_valid = False
             report["validation_results"]["error_count"] += 1
-            file_info["validation_error"] = error_msg
-
-        report["txt_files"].append(file_info)
 
     # Set overall validation results
     report["validation_results"]["txt_files_valid"] = all_txt_valid
@@ -187,14 +401,16 @@ def generate_validation_report(extracted_dir, xml_path, output_dir):
 
     # Save report
     os.makedirs(output_dir, exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        f.write(dump_json(dict(results)))
     report_path = os.path.join(output_dir, "validation_report.json")
-    with open(report_path, 'w') as f:
-        json.dump(report, f, indent=2)
+    with open(report_path, 'wb') as f:
+        f.write(dump_json(report))
 
     logger.info(f"Validation report saved to {report_path}")
     logger.info(f"Validation result: {'PASSED' if report['validation_results']['overall_valid'] else 'FAILED'}")
 
-    return report_path
+    return report_path, report
 
 
 def validate_raw_data(bronze_bucket, bronze_prefix, temp_dir):
@@ -222,11 +438,7 @@ def validate_raw_data(bronze_bucket, bronze_prefix, temp_dir):
         validation_dir = os.path.join(temp_dir, 'validation')
 
         # Generate validation report
-        report_path = generate_validation_report(extracted_dir, xml_path, validation_dir)
-
-        # Load report to check validation status
-        with open(report_path, 'r') as f:
-            report = json.load(f)
+        _, report = generate_validation_report(extracted_dir, xml_path, validation_dir)
 
         return report["validation_results"]["overall_valid"]
 
@@ -239,6 +451,8 @@ if __name__ == "__main__":
     # For standalone testing
     import argparse
 
+    configure_logging()
+
     parser = argparse.ArgumentParser(description='Validate podcast data files')
     parser.add_argument('--config', default='../../config/config.yaml', help='Path to config file')
     parser.add_argument('--temp-dir', required=True, help='Temporary directory with downloaded files')
@@ -5,78 +5,135 @@ This module handles downloading podcast data files from S3 buckets.
 It retrieves the necessary zip and XML files and extracts them for processing.
 """
 
-import boto3
+from boto3.s3.transfer import TransferConfig
 import os
+import io
+import json
 import zipfile
 import logging
-import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+from scripts.ingestion._common import (
+    CREDENTIALS_PATH,
+    DOWNLOAD_MANIFEST,
+    HASH_ALGO,
+    S3_CHECKSUM_FIELDS,
+    configure_logging,
+    get_s3_client,
+    load_config,
+    new_hasher
 )
+
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
+# Extraction copies members in 1 MiB chunks and keeps at most 64 KiB of each file's head
+EXTRACT_CHUNK_SIZE = 1 * MB
+HEAD_CAPTURE_SIZE = 64 * 1024
+
+# Split large objects into ranged GETs fetched over parallel connections
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * MB,
+    multipart_chunksize=64 * MB,
+    max_concurrency=16,
+    max_io_queue=10000,
+    io_chunksize=1 * MB
+)
+
+
+def ensure_dir(directory):
+    """
+    Create directory if it doesn't exist
+
+    Args:
+        directory: Directory path to create
+    """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+        logger.info(f"Created directory: {directory}")
 
-def load_config(config_path):
+
+def get_s3_checksums(s3_client, bucket, key):
     """
-    Load configuration from YAML file
+    Fetch the checksums S3 stored for an object
+
+    Objects uploaded without a checksum algorithm return an empty dict.
 
     Args:
-        config_path: Path to config YAML file
+        s3_client: Configured S3 client
+        bucket: S3 bucket name
+        key: Object key
 
     Returns:
-        dict: Configuration values
+        dict: Checksum field name -> value (e.g. ChecksumCRC32C)
     """
     try:
-        with open(config_path, 'r') as file:
-            config = yaml.safe_load(file)
-        logger.info(f"Loaded configuration from {config_path}")
-        return config
+        response = s3_client.head_object(Bucket=bucket, Key=key, ChecksumMode='ENABLED')
     except Exception as e:
-        logger.error(f"Error loading configuration: {e}")
-        raise
+        logger.warning(f"Could not fetch S3 checksums for {key}: {e}")
+        return {}
+    return {field: response[field] for field in S3_CHECKSUM_FIELDS if response.get(field)}
 
 
-def get_s3_client(credentials_path):
+def member_target_path(extract_dir, member_name):
     """
-    Create S3 client using credentials from YAML file
+    Local path of a zip member, sanitized the same way ZipFile.extract does
 
     Args:
-        credentials_path: Path to credentials YAML file
+        extract_dir: Destination directory
+        member_name: Member name inside the archive
 
     Returns:
-        boto3.client: Configured S3 client
+        str: Path the member is written to
     """
-    try:
-        with open(credentials_path, 'r') as file:
-            credentials = yaml.safe_load(file)
-
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=credentials['aws']['access_key_id'],
-            aws_secret_access_key=credentials['aws']['secret_access_key'],
-            region_name=credentials['aws']['region']
-        )
-        logger.info("Successfully created S3 client")
-        return s3_client
-    except Exception as e:
-        logger.error(f"Error creating S3 client: {e}")
-        raise
+    arcname = os.path.splitdrive(member_name.replace('/', os.path.sep))[1]
+    invalid_parts = ('', os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(part for part in arcname.split(os.path.sep) if part not in invalid_parts)
+    return os.path.join(extract_dir, arcname)
 
 
-def ensure_dir(directory):
+def extract_members(zip_path, members, extract_dir):
     """
-    Create directory if it doesn't exist
+    Extract a batch of zip members using a dedicated ZipFile handle
+
+    Each member is hashed and its first two lines captured while it is being
+    written, so the validator does not have to read the file again.
 
     Args:
-        directory: Directory path to create
+        zip_path: Path to zip archive
+        members: ZipInfo entries to extract
+        extract_dir: Destination directory
+
+    Returns:
+        dict: Path relative to extract_dir -> size, hash, hash algorithm, header and sample line
     """
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        logger.info(f"Created directory: {directory}")
+    extracted = {}
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for member in members:
+            hasher = new_hasher()
+            head = b''
+            size = 0
+            target_path = member_target_path(extract_dir, member.filename)
+            with zip_ref.open(member) as src, open(target_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(EXTRACT_CHUNK_SIZE), b''):
+                    dst.write(chunk)
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    if len(head) < HEAD_CAPTURE_SIZE and head.count(b'\n') < 2:
+                        head += chunk[:HEAD_CAPTURE_SIZE]
+
+            lines = io.BytesIO(head)
+            extracted[os.path.relpath(target_path, extract_dir)] = {
+                "size_bytes": size,
+                "hash": hasher.hexdigest(),
+                "hash_algo": HASH_ALGO,
+                # latin-1 round-trips arbitrary bytes through JSON
+                "header": lines.readline().decode('latin-1'),
+                "sample": lines.readline().decode('latin-1')
+            }
+    return extracted
 
 
 def download_files_from_s3(source_bucket, bronze_bucket, source_prefix, bronze_prefix,
@@ -97,38 +154,33 @@ def download_files_from_s3(source_bucket, bronze_bucket, source_prefix, bronze_p
         tuple: (extract_dir, xml_path) paths to extracted files and XML
     """
     try:
-        # Load credentials and configuration
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
-        credentials_path = "/home/cortica/2nd_degree/work_search_projects/spotify_project_py/configs/credentials.yaml "
-
-       # credentials_path = os.path.join(project_root, 'configs', 'credentials.yaml')
-
         # Get S3 client
-        s3_client = get_s3_client(credentials_path)
+        s3_client = get_s3_client(CREDENTIALS_PATH)
 
         # Ensure temporary directory exists
         ensure_dir(local_temp_dir)
 
-        # Download ZIP file
+        # Download the ZIP and XML files side by side; boto3 clients are thread-safe
         zip_path = os.path.join(local_temp_dir, zip_file_name)
-        logger.info(f"Downloading {zip_file_name} from S3...")
-        s3_client.download_file(
-            source_bucket,
-            f"{source_prefix}{zip_file_name}",
-            zip_path
-        )
-        logger.info(f"Successfully downloaded {zip_file_name}")
-
-        # Download XML file
         xml_path = os.path.join(local_temp_dir, xml_file_name)
-        logger.info(f"Downloading {xml_file_name} from S3...")
-        s3_client.download_file(
-            source_bucket,
-            f"{source_prefix}{xml_file_name}",
-            xml_path
-        )
-        logger.info(f"Successfully downloaded {xml_file_name}")
+
+        def download(file_name, local_path):
+            logger.info(f"Downloading {file_name} from S3...")
+            s3_client.download_file(
+                source_bucket,
+                f"{source_prefix}{file_name}",
+                local_path,
+                Config=TRANSFER_CONFIG
+            )
+            logger.info(f"Successfully downloaded {file_name}")
+            return get_s3_checksums(s3_client, source_bucket, f"{source_prefix}{file_name}")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            downloads = {
+                zip_file_name: executor.submit(download, zip_file_name, zip_path),
+                xml_file_name: executor.submit(download, xml_file_name, xml_path)
+            }
+            s3_checksums = {file_name: future.result() for file_name, future in downloads.items()}
 
         # Extract files from zip
         extract_dir = os.path.join(local_temp_dir, 'extracted')
@@ -136,13 +188,30 @@ def download_files_from_s3(source_bucket, bronze_bucket, source_prefix, bronze_p
 
         logger.info(f"Extracting {zip_file_name}...")
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Filter to extract only txt files
-            txt_files = [f for f in zip_ref.namelist() if f.endswith('.txt')]
-            for txt_file in txt_files:
-                zip_ref.extract(txt_file, extract_dir)
+            # Filter to extract only txt files; the central directory is read once here
+            txt_files = [info for info in zip_ref.infolist() if info.filename.endswith('.txt')]
+
+        # Create member folders up front so workers never race on makedirs
+        for member_dir in {os.path.dirname(member_target_path(extract_dir, info.filename)) for info in txt_files}:
+            os.makedirs(member_dir, exist_ok=True)
+
+        # zlib releases the GIL while inflating, so members are extracted in parallel;
+        # each worker gets its own ZipFile handle since they are not thread-safe
+        workers = max(1, min(os.cpu_count() or 1, len(txt_files)))
+        batches = [txt_files[i::workers] for i in range(workers)]
+        extracted_files = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for extracted in executor.map(lambda batch: extract_members(zip_path, batch, extract_dir), batches):
+                extracted_files.update(extracted)
 
         logger.info(f"Extracted {len(txt_files)} txt files to {extract_dir}")
 
+        # Record the checksums S3 already computed and the extraction-time hashes/headers
+        # so validation can skip re-reading the files
+        manifest_path = os.path.join(local_temp_dir, DOWNLOAD_MANIFEST)
+        with open(manifest_path, 'w') as f:
+            json.dump({"s3_checksums": s3_checksums, "extracted_files": extracted_files}, f, indent=2)
+
         return extract_dir, xml_path
 
     except Exception as e:
@@ -154,6 +223,8 @@ if __name__ == "__main__":
     # For standalone testing
     import argparse
 
+    configure_logging()
+
     parser = argparse.ArgumentParser(description='Download podcast data from S3')
     parser.add_argument('--config', default='../../config/config.yaml', help='Path to config file')
     args = parser.parse_args()
@@ -5,69 +5,27 @@ This module handles uploading processed podcast data files to S3 buckets.
 It supports uploading to different data layers (bronze, silver, gold).
 """
 
-import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
 import os
 import logging
-import yaml
 import glob
+import fnmatch
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+from scripts.ingestion._common import (
+    CREDENTIALS_PATH,
+    configure_logging,
+    get_s3_client,
+    load_config
 )
-logger = logging.getLogger(__name__)
-
-
-def load_config(config_path):
-    """
-    Load configuration from YAML file
-
-    Args:
-        config_path: Path to config YAML file
-
-    Returns:
-        dict: Configuration values
-    """
-    try:
-        with open(config_path, 'r') as file:
-            config = yaml.safe_load(file)
-        logger.info(f"Loaded configuration from {config_path}")
-        return config
-    except Exception as e:
-        logger.error(f"Error loading configuration: {e}")
-        raise
-
 
-def get_s3_client(credentials_path):
-    """
-    Create S3 client using credentials from YAML file
+logger = logging.getLogger(__name__)
 
-    Args:
-        credentials_path: Path to credentials YAML file
-
-    Returns:
-        boto3.client: Configured S3 client
-    """
-    try:
-        with open(credentials_path, 'r') as file:
-            credentials = yaml.safe_load(file)
-
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=credentials['aws']['access_key_id'],
-            aws_secret_access_key=credentials['aws']['secret_access_key'],
-            region_name=credentials['aws']['region']
-        )
-        logger.info("Successfully created S3 client")
-        return s3_client
-    except Exception as e:
-        logger.error(f"Error creating S3 client: {e}")
-        raise
+MB = 1024 * 1024
 
 
-def upload_directory_to_s3(s3_client, local_dir, bucket, prefix, file_pattern="*"):
+def upload_directory_to_s3(s3_client, local_dir, bucket, prefix, file_pattern="*",
+                           use_threads=True, max_workers=32):
     """
     Upload all files in a directory to S3
 
@@ -77,6 +35,8 @@ def upload_directory_to_s3(s3_client, local_dir, bucket, prefix, file_pattern="*
         bucket: Destination S3 bucket
         prefix: S3 key prefix (folder)
         file_pattern: File pattern to match (default: all files)
+        use_threads: Upload files concurrently (default: True)
+        max_workers: Maximum number of concurrent transfer threads
 
     Returns:
         int: Number of files uploaded
@@ -87,25 +47,42 @@ def upload_directory_to_s3(s3_client, local_dir, bucket, prefix, file_pattern="*
             logger.error(f"Local directory does not exist: {local_dir}")
             return 0
 
-        # Get files matching pattern
-        search_pattern = os.path.join(local_dir, file_pattern)
-        files = glob.glob(search_pattern)
+        # Get files matching pattern; flat patterns use scandir's cached stat results,
+        # patterns that span folders (e.g. "**/*.parquet") still need glob
+        if os.sep in file_pattern or '/' in file_pattern:
+            search_pattern = os.path.join(local_dir, file_pattern)
+            files = [file_path for file_path in glob.glob(search_pattern) if os.path.isfile(file_path)]
+        else:
+            with os.scandir(local_dir) as it:
+                files = [entry.path for entry in it
+                         if entry.is_file() and fnmatch.fnmatch(entry.name, file_pattern)]
 
         if not files:
             logger.warning(f"No files found matching pattern '{file_pattern}' in {local_dir}")
             return 0
 
-        # Upload each file
-        upload_count = 0
-        for file_path in files:
-            if os.path.isfile(file_path):
+        # One transfer manager schedules every file (and every part of large files)
+        # on a shared pool of threads; boto3 clients are thread-safe
+        config = TransferConfig(
+            multipart_threshold=64 * MB,
+            multipart_chunksize=64 * MB,
+            max_concurrency=max_workers,
+            use_threads=use_threads
+        )
+        with create_transfer_manager(s3_client, config) as transfer_manager:
+            futures = []
+            for file_path in files:
                 file_name = os.path.basename(file_path)
                 s3_key = f"{prefix.rstrip('/')}/{file_name}"
 
                 logger.info(f"Uploading {file_name} to s3://{bucket}/{s3_key}")
-                s3_client.upload_file(file_path, bucket, s3_key)
-                upload_count += 1
+                futures.append(transfer_manager.upload(file_path, bucket, s3_key))
 
+            # Wait for every upload, re-raising the first failure
+            for future in futures:
+                future.result()
+
+        upload_count = len(files)
         logger.info(f"Successfully uploaded {upload_count} files to S3")
         return upload_count
 
@@ -129,14 +106,8 @@ def upload_to_data_layer(source_dir, bucket, prefix, layer_name, file_pattern="*
         int: Number of files uploaded
     """
     try:
-        # Load credentials
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
-        #credentials_path = os.path.join(project_root, 'config', 'credentials.yaml')
-        credentials_path = "/home/cortica/2nd_degree/work_search_projects/spotify_project_py/configs/credentials.yaml "
-
         # Get S3 client
-        s3_client = get_s3_client(credentials_path)
+        s3_client = get_s3_client(CREDENTIALS_PATH)
 
         logger.info(f"Starting upload to {layer_name} layer")
 
@@ -209,6 +180,8 @@ if __name__ == "__main__":
     # For standalone testing
     import argparse
 
+    configure_logging()
+
     parser = argparse.ArgumentParser(description='Upload podcast data to S3')
     parser.add_argument('--config', default='../../config/config.yaml', help='Path to config file')
     parser.add_argument('--source-dir', required=True, help='Source directory with files to upload')
@@ -1,10 +1,22 @@
 # Step 1: Create a virtual environment (recommended)
 import os
+import shutil
 import subprocess
+import tarfile
+import textwrap
 import time
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 import requests
 import json
+from pathlib import Path
+
+# Shared HTTP session so readiness probes reuse one keep-alive connection
+SESSION = requests.Session()
+
+# (schema, table) pairs known to exist in the hive catalog during this process
+REGISTERED_TABLES = set()
 
 
 # Create and activate a virtual environment
@@ -21,60 +33,113 @@ def setup_environment():
     subprocess.run([pip_path, "install", "trino", "pandas", "requests"])
 
 
+TRINO_SERVER_URL = "https://repo1.maven.org/maven2/io/trino/trino-server/413/trino-server-413.tar.gz"
+
+
+# Yield archive members with their leading path component removed (tar --strip-components=1)
+def strip_components(tar, count=1):
+    for member in tar:
+        parts = member.name.split("/")[count:]
+        if not parts or not parts[0]:
+            continue
+        member.name = "/".join(parts)
+        if member.islnk():
+            member.linkname = "/".join(member.linkname.split("/")[count:])
+        yield member
+
+
 # Step 2: Download and set up Trino server
 def download_trino():
     if not os.path.exists("trino-server"):
         print("Downloading Trino server...")
-        # Download Trino server (adjust version as needed)
-        subprocess.run(["wget", "https://repo1.maven.org/maven2/io/trino/trino-server/413/trino-server-413.tar.gz"])
-        subprocess.run(["mkdir", "-p", "trino-server"])
-        subprocess.run(["tar", "-xzf", "trino-server-413.tar.gz", "-C", "trino-server", "--strip-components=1"])
-        subprocess.run(["rm", "trino-server-413.tar.gz"])
+        # Stream the tarball straight from the HTTP response into the extractor,
+        # so no intermediate archive is written to disk (adjust version as needed)
+        os.makedirs("trino-server", exist_ok=True)
+        try:
+            with requests.get(TRINO_SERVER_URL, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+                    tar.extractall("trino-server", members=strip_components(tar))
+        except Exception:
+            # Do not leave a half-extracted server behind; the next run retries the download
+            shutil.rmtree("trino-server", ignore_errors=True)
+            raise
 
         # Create necessary directories for configuration
-        subprocess.run(["mkdir", "-p", "trino-server/etc/catalog"])
+        os.makedirs("trino-server/etc/catalog", exist_ok=True)
 
 
 # Step 3: Configure Trino server
+# File templates; {data_directory} is filled in by configure_trino
+TRINO_CONFIG_FILES = {
+    "config.properties": textwrap.dedent("""\
+        coordinator=true
+        node-scheduler.include-coordinator=true
+        http-server.http.port=8080
+        discovery.uri=http://localhost:8080
+    """),
+    "jvm.config": textwrap.dedent("""\
+        -server
+        -Xmx4G
+        -XX:+UseG1GC
+        -XX:G1HeapRegionSize=32M
+        -XX:+UseGCOverheadLimit
+        -XX:+ExplicitGCInvokesConcurrent
+        -XX:+HeapDumpOnOutOfMemoryError
+        -XX:+ExitOnOutOfMemoryError
+        -Djdk.attach.allowAttachSelf=true
+    """),
+    "node.properties": textwrap.dedent("""\
+        node.environment=development
+        node.id=trino-local
+        node.data-dir={data_directory}
+    """),
+    # Catalog for Parquet files
+    "catalog/hive.properties": textwrap.dedent("""\
+        connector.name=hive
+        hive.metastore=file
+        hive.metastore.catalog.dir=file://{data_directory}/metastore
+        hive.non-managed-table-writes-enabled=true
+        hive.storage-format=PARQUET
+        hive.allow-drop-table=true
+        hive.allow-rename-table=true
+        hive.allow-add-column=true
+        hive.allow-drop-column=true
+        hive.allow-rename-column=true
+    """),
+}
+
+
 def configure_trino(data_directory):
-    # Create config.properties
-    with open("trino-server/etc/config.properties", "w") as f:
-        f.write("coordinator=true\n")
-        f.write("node-scheduler.include-coordinator=true\n")
-        f.write("http-server.http.port=8080\n")
-        f.write("discovery.uri=http://localhost:8080\n")
-
-    # Create jvm.config
-    with open("trino-server/etc/jvm.config", "w") as f:
-        f.write("-server\n")
-        f.write("-Xmx4G\n")
-        f.write("-XX:+UseG1GC\n")
-        f.write("-XX:G1HeapRegionSize=32M\n")
-        f.write("-XX:+UseGCOverheadLimit\n")
-        f.write("-XX:+ExplicitGCInvokesConcurrent\n")
-        f.write("-XX:+HeapDumpOnOutOfMemoryError\n")
-        f.write("-XX:+ExitOnOutOfMemoryError\n")
-        f.write("-Djdk.attach.allowAttachSelf=true\n")
-
-    # Create node.properties
-    with open("trino-server/etc/node.properties", "w") as f:
-        f.write(f"node.environment=development\n")
-        f.write(f"node.id=trino-local\n")
-        f.write(f"node.data-dir={data_directory}\n")
-
-    # Create catalog/hive.properties for Parquet files
-    os.makedirs("trino-server/etc/catalog", exist_ok=True)
-    with open("trino-server/etc/catalog/hive.properties", "w") as f:
-        f.write("connector.name=hive\n")
-        f.write("hive.metastore=file\n")
-        f.write(f"hive.metastore.catalog.dir=file://{data_directory}/metastore\n")
-        f.write("hive.non-managed-table-writes-enabled=true\n")
-        f.write("hive.storage-format=PARQUET\n")
-        f.write("hive.allow-drop-table=true\n")
-        f.write("hive.allow-rename-table=true\n")
-        f.write("hive.allow-add-column=true\n")
-        f.write("hive.allow-drop-column=true\n")
-        f.write("hive.allow-rename-column=true\n")
+    # Write each config file in one call
+    etc_dir = Path("trino-server/etc")
+    (etc_dir / "catalog").mkdir(parents=True, exist_ok=True)
+    for file_name, template in TRINO_CONFIG_FILES.items():
+        (etc_dir / file_name).write_text(template.format(data_directory=data_directory))
+
+
+TRINO_INFO_URL = "http://localhost:8080/v1/info"
+
+
+# Poll a URL until predicate(response) holds, backing off from 100ms up to max_delay
+def wait_until(url, predicate, timeout=120, max_delay=1.0):
+    delay = 0.1
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = SESSION.get(url, timeout=1)
+            if predicate(response):
+                return True
+        except (requests.exceptions.RequestException, ValueError):
+            pass
+        time.sleep(delay)
+        delay = min(delay * 1.6, max_delay)
+    return False
+
+
+# Trino reports "starting": false on /v1/info once it accepts queries
+def trino_started(response):
+    return response.ok and response.json().get("starting") is False
 
 
 # Step 4: Start Trino server
@@ -90,103 +155,86 @@ def start_trino_server():
             preexec_fn=os.setsid if os.name != 'nt' else None
         )
 
-    # Wait for server to start
+    # Wait until the server reports it has finished initializing, instead of a fixed sleep
     print("Waiting for Trino server to start...")
-    max_attempts = 30
-    attempts = 0
-
-    while attempts < max_attempts:
-        try:
-            response = requests.get("http://localhost:8080/v1/info")
-            if response.status_code == 200:
-                print("Trino server started successfully!")
-                # Add additional wait time to ensure the server is fully initialized
-                print("Waiting for full initialization (30 seconds)...")
-                time.sleep(30)
-                return True
-        except requests.exceptions.ConnectionError:
-            pass
-
-        time.sleep(2)
-        attempts += 1
+    if wait_for_trino_ready():
+        print("Trino server started successfully!")
+        return True
 
     print("Failed to start Trino server within the timeout period")
     return False
 
 
 # Step 5: Check if Trino server is ready for queries
-def wait_for_trino_ready():
-    max_attempts = 20
-    attempts = 0
-
-    print("Checking if Trino is ready for queries...")
-    while attempts < max_attempts:
-        try:
-            # Try a simple query to verify server is ready
-            import trino
-            conn = trino.dbapi.connect(
-                host="localhost",
-                port=8080,
-                user="trino",
-                catalog="system",  # Use system catalog which is always available
-                schema="runtime"
-            )
-            cursor = conn.cursor()
-
-            try:
-                cursor.execute("SELECT 1")
-                cursor.fetchall()
-                conn.close()
-                print("Trino is ready to accept queries!")
-                return True
-            except trino.exceptions.TrinoQueryError as e:
-                if "SERVER_STARTING_UP" in str(e):
-                    print(f"Server still initializing... waiting (attempt {attempts + 1}/{max_attempts})")
-                else:
-                    print(f"Error: {e}")
-
-            conn.close()
-        except Exception as e:
-            print(f"Connection error: {e}")
-
-        time.sleep(5)
-        attempts += 1
+def wait_for_trino_ready(timeout=120):
+    # One /v1/info poll on a 100ms tick covers both startup and query readiness
+    if wait_until(TRINO_INFO_URL, trino_started, timeout=timeout, max_delay=0.1):
+        print("Trino is ready to accept queries!")
+        return True
 
     print("Server startup timed out or has issues. Check trino.log for details.")
     return False
 
 
-# Step 5: Create a schema for Parquet files
-def create_schema_and_table(parquet_file_path, schema_name, table_name):
-    # Get DataFrame schema to infer Parquet schema
-    df = pd.read_parquet(parquet_file_path)
-
-    # Connect to Trino
+# Open a connection to the local Trino server's hive catalog
+def connect_trino(schema="default"):
     import trino
-    conn = trino.dbapi.connect(
+    return trino.dbapi.connect(
         host="localhost",
         port=8080,
         user="trino",
         catalog="hive",
-        schema="default"
+        schema=schema
     )
+
+
+# Step 5: Create a schema for Parquet files
+# Pass conn to reuse an open connection; otherwise one is opened and closed here.
+# Pass arrow_schema when the caller already knows the data's schema to skip reading the files
+def create_schema_and_table(parquet_file_path, schema_name, table_name, conn=None, arrow_schema=None):
+    if (schema_name, table_name) in REGISTERED_TABLES:
+        print(f"Table {schema_name}.{table_name} already registered")
+        return
+
+    # Connect to Trino
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_trino()
     cursor = conn.cursor()
 
+    # A warm metastore already has the table; one small lookup skips both DDL statements
+    cursor.execute(
+        "SELECT 1 FROM hive.information_schema.tables WHERE table_schema = ? AND table_name = ?",
+        (schema_name, table_name)
+    )
+    if cursor.fetchall():
+        REGISTERED_TABLES.add((schema_name, table_name))
+        if owns_conn:
+            conn.close()
+        print(f"Table {schema_name}.{table_name} already exists")
+        return
+
+    # Otherwise infer the table schema from the Parquet footer metadata only; no row data is read.
+    # Works for a single file or a hive-partitioned directory
+    schema = arrow_schema
+    if schema is None:
+        schema = ds.dataset(parquet_file_path, format="parquet", partitioning="hive").schema
+
     # Create schema if it doesn't exist
     cursor.execute(f"CREATE SCHEMA IF NOT EXISTS hive.{schema_name}")
 
     # Create a table definition based on the Parquet schema
     columns = []
-    for col_name, dtype in df.dtypes.items():
-        if pd.api.types.is_integer_dtype(dtype):
+    for field in schema:
+        if pa.types.is_integer(field.type):
             col_type = "BIGINT"
-        elif pd.api.types.is_float_dtype(dtype):
+        elif pa.types.is_floating(field.type):
             col_type = "DOUBLE"
-        elif pd.api.types.is_datetime64_any_dtype(dtype):
+        elif pa.types.is_timestamp(field.type):
             col_type = "TIMESTAMP"
         else:
             col_type = "VARCHAR"
-        columns.append(f"{col_name} {col_type}")
+        columns.append(f"{field.name} {col_type}")
 
     # Create table
     columns_str = ", ".join(columns)
@@ -200,27 +248,24 @@ def create_schema_and_table(parquet_file_path, schema_name, table_name):
     )
     """
     cursor.execute(create_table_query)
+    REGISTERED_TABLES.add((schema_name, table_name))
 
     # Close connection
-    conn.close()
+    if owns_conn:
+        conn.close()
 
     print(f"Table {schema_name}.{table_name} created successfully!")
 
 
 # Step 6: Query the data
-def query_data(schema_name, table_name):
-    import trino
-    conn = trino.dbapi.connect(
-        host="localhost",
-        port=8080,
-        user="trino",
-        catalog="hive",
-        schema=schema_name
-    )
+def query_data(schema_name, table_name, conn=None):
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_trino(schema_name)
     cursor = conn.cursor()
 
-    # Execute a test query
-    cursor.execute(f"SELECT * FROM {table_name} LIMIT 10")
+    # Execute a test query; fully qualified so a shared connection's default schema does not matter
+    cursor.execute(f"SELECT * FROM {schema_name}.{table_name} LIMIT 10")
     rows = cursor.fetchall()
 
     # Get column names
@@ -230,13 +275,15 @@ def query_data(schema_name, table_name):
     results_df = pd.DataFrame(rows, columns=column_names)
 
     # Close connection
-    conn.close()
+    if owns_conn:
+        conn.close()
 
     return results_df
 
 
 # Main function to run everything
-def setup_local_trino_for_parquet(parquet_file_path, schema_name="parquet_data", table_name="user_actions"):
+def setup_local_trino_for_parquet(parquet_file_path, schema_name="parquet_data", table_name="user_actions",
+                                  arrow_schema=None):
     # Create data directory
     data_dir = os.path.abspath("./trino-data")
     os.makedirs(data_dir, exist_ok=True)
@@ -248,45 +295,49 @@ def setup_local_trino_for_parquet(parquet_file_path, schema_name="parquet_data",
     download_trino()
     configure_trino(data_dir)
 
-    # Start Trino server
+    # Start Trino server; returns once it reports it is ready for queries
     if start_trino_server():
-        # Wait for Trino to be fully ready
-        if wait_for_trino_ready():
-            # Create schema and table for Parquet data
-            try:
-                create_schema_and_table(parquet_file_path, schema_name, table_name)
-
-                # Run a sample query
-                print("\nSample query results:")
-                results = query_data(schema_name, table_name)
-                print(results)
-
-                # Show an example of running a custom SQL query
-                print("\nExample code to run your own SQL queries:")
-                print("""
-                import trino
-                conn = trino.dbapi.connect(
-                    host="localhost",
-                    port=8080,
-                    user="trino",
-                    catalog="hive",
-                    schema="parquet_data"
-                )
-                cursor = conn.cursor()
-
-                # Run your SQL query
-                cursor.execute("SELECT timestamp, user_id, action, COUNT(*) FROM user_actions GROUP BY 1, 2, 3 ORDER BY COUNT(*) DESC LIMIT 10")
-
-                # Fetch and print results
-                for row in cursor.fetchall():
-                    print(row)
-
-                # Close connection
+        # Create schema and table for Parquet data over one shared connection
+        conn = None
+        try:
+            conn = connect_trino()
+            create_schema_and_table(parquet_file_path, schema_name, table_name, conn=conn,
+                                    arrow_schema=arrow_schema)
+
+            # Run a sample query
+            print("\nSample query results:")
+            results = query_data(schema_name, table_name, conn=conn)
+            print(results)
+
+            # Show an example of running a custom SQL query
+            print("\nExample code to run your own SQL queries:")
+            print("""
+            import trino
+            conn = trino.dbapi.connect(
+                host="localhost",
+                port=8080,
+                user="trino",
+                catalog="hive",
+                schema="parquet_data"
+            )
+            cursor = conn.cursor()
+
+            # Run your SQL query
+            cursor.execute("SELECT timestamp, user_id, action, COUNT(*) FROM user_actions GROUP BY 1, 2, 3 ORDER BY COUNT(*) DESC LIMIT 10")
+
+            # Fetch and print results
+            for row in cursor.fetchall():
+                print(row)
+
+            # Close connection
+            conn.close()
+            """)
+        except Exception as e:
+            print(f"Error creating schema or querying data: {e}")
+            print("Check the logs for more details.")
+        finally:
+            if conn is not None:
                 conn.close()
-                """)
-            except Exception as e:
-                print(f"Error creating schema or querying data: {e}")
-                print("Check the logs for more details.")
 
 
 # Example usage
@@ -7,16 +7,25 @@ the data for conversion to analytical formats.
 """
 
 import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import logging
 import yaml
 import glob
 from datetime import datetime
 import re
 import json
+import shutil
 import traceback
 from pathlib import Path
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dateutil.tz import tzlocal
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +34,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once; the vectorized paths pass their .pattern strings to pandas/Arrow
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+# Raw stream file layout: timestamp|user_id|action|episode_id
+RAW_COLUMNS = ['timestamp', 'user_id', 'action', 'episode_id']
+
+# Reader options are built once; every column stays a string so epochs and IDs
+# are not run through dtype inference before validation
+RAW_READ_OPTIONS = pacsv.ReadOptions(column_names=RAW_COLUMNS)
+RAW_CONVERT_OPTIONS = pacsv.ConvertOptions(
+    column_types={name: pa.string() for name in RAW_COLUMNS},
+    strings_can_be_null=True
+)
+
+# Column layout of the cleaned output files; values stay as standardized strings
+CLEANED_SCHEMA = pa.schema([
+    ('timestamp', pa.string()),
+    ('user_id', pa.string()),
+    ('action', pa.dictionary(pa.int32(), pa.string())),
+    ('episode_id', pa.string()),
+    ('file_source', pa.dictionary(pa.int32(), pa.string())),
+    ('processed_at', pa.string())
+])
+
+# Accepted timestamp layouts and their strptime formats; None marks Unix epochs
+TS_PATTERNS = [
+    # ISO format: 2024-01-01T01:40:00
+    (re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$'), '%Y-%m-%dT%H:%M:%S'),
+    # ISO with milliseconds: 2024-01-01T01:40:00.123 (%f takes at most 6 digits)
+    (re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{1,6}$'), '%Y-%m-%dT%H:%M:%S.%f'),
+    # Date with space: 2024-01-01 01:40:00
+    (re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$'), '%Y-%m-%d %H:%M:%S'),
+    # Unix timestamp (seconds since epoch)
+    (re.compile(r'^\d{10}$'), None),
+    # Unix timestamp (milliseconds since epoch)
+    (re.compile(r'^\d{13}$'), None)
+]
+
+# Action values that still need lowercasing or trimming
+ACTION_NEEDS_NORMALIZING = r'\p{Lu}|^\s|\s$'
+
+# Either epoch layout, so both are converted in a single pass
+EPOCH_RE = re.compile(r'^(?:\d{10}|\d{13})$')
+
+EPISODE_RE = re.compile(r'(\d+)')
+
 
 def load_config(config_path):
     """
@@ -52,28 +107,14 @@ def validate_timestamp(timestamp):
     Returns:
         str: Standardized ISO timestamp or None if invalid
     """
-    # Define common timestamp patterns
-    patterns = [
-        # ISO format: 2024-01-01T01:40:00
-        (r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$', '%Y-%m-%dT%H:%M:%S'),
-        # ISO with milliseconds: 2024-01-01T01:40:00.123
-        (r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+$', '%Y-%m-%dT%H:%M:%S.%f'),
-        # Date with space: 2024-01-01 01:40:00
-        (r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$', '%Y-%m-%d %H:%M:%S'),
-        # Unix timestamp (seconds since epoch)
-        (r'^\d{10}$', None),
-        # Unix timestamp (milliseconds since epoch)
-        (r'^\d{13}$', None)
-    ]
-
     if not timestamp or pd.isna(timestamp):
         return None
 
     timestamp = str(timestamp).strip()
 
     # Try each pattern
-    for pattern, fmt in patterns:
-        if re.match(pattern, timestamp):
+    for pattern, fmt in TS_PATTERNS:
+        if pattern.match(timestamp):
             try:
                 if fmt:
                     # Parse with specified format
@@ -94,6 +135,52 @@ def validate_timestamp(timestamp):
     return None
 
 
+def standardize_timestamps(timestamps):
+    """
+    Vectorized validate_timestamp over a whole column
+
+    Each accepted layout is matched and parsed in one pandas call. Unix epochs
+    (seconds and milliseconds together) are scaled to nanoseconds with integer
+    NumPy arithmetic and converted to local time like datetime.fromtimestamp.
+
+    Args:
+        timestamps: pandas.Series of raw timestamp values
+
+    Returns:
+        pandas.Series: Standardized ISO timestamps, NaN where invalid
+    """
+    ts = timestamps.astype('string').str.strip()
+    parsed = pd.Series(pd.NaT, index=ts.index, dtype='datetime64[ns]')
+
+    for pattern, fmt in TS_PATTERNS:
+        if fmt is None:
+            # Epoch layouts are handled together below
+            continue
+        mask = ts.str.fullmatch(pattern.pattern).fillna(False).astype(bool)
+        if mask.any():
+            parsed[mask] = pd.to_datetime(ts[mask], format=fmt, errors='coerce')
+
+    epoch_mask = ts.str.fullmatch(EPOCH_RE.pattern).fillna(False).to_numpy(dtype=bool)
+    if epoch_mask.any():
+        digits = ts[epoch_mask]
+        values = digits.astype('int64').to_numpy()
+        # 10 digits are seconds, 13 digits milliseconds
+        scale = np.where(digits.str.len().to_numpy() == 10, 1_000_000_000, 1_000_000)
+        # Instants past datetime64[ns] (year 2262) would overflow; leave them NaT
+        in_range = values <= np.iinfo(np.int64).max // scale
+        nanos = np.where(in_range, values * scale, np.iinfo(np.int64).min)  # int64 min is NaT
+        epochs = pd.DatetimeIndex(nanos.view('datetime64[ns]')).tz_localize('UTC')
+        local = epochs.tz_convert(tzlocal()).tz_localize(None)
+        parsed[epoch_mask] = local.to_numpy()
+
+    # Match datetime.isoformat(): fractional seconds only when non-zero
+    iso = parsed.dt.strftime('%Y-%m-%dT%H:%M:%S')
+    fractional = parsed.dt.microsecond.fillna(0) != 0
+    if fractional.any():
+        iso[fractional] = parsed[fractional].dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+    return iso
+
+
 def validate_uuid(uuid_str):
     """
     Validate if a string is a valid UUID
@@ -104,18 +191,50 @@ def validate_uuid(uuid_str):
     Returns:
         str: Validated UUID or None if invalid
     """
-    uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-
     if not uuid_str or pd.isna(uuid_str):
         return None
 
     uuid_str = str(uuid_str).strip().lower()
 
-    if re.match(uuid_pattern, uuid_str):
+    if UUID_RE.match(uuid_str):
         return uuid_str
     return None
 
 
+def standardize_uuids(uuids):
+    """
+    Vectorized validate_uuid over a whole column using Arrow compute kernels
+
+    Args:
+        uuids: pandas.Series of raw user IDs
+
+    Returns:
+        pandas.Series: Lowercased UUIDs, None where invalid
+    """
+    arr = pa.array(uuids.astype('string'))
+    lowered = pc.utf8_lower(pc.utf8_trim_whitespace(arr))
+    valid = pc.match_substring_regex(lowered, UUID_RE.pattern)
+    cleaned = pc.if_else(valid, lowered, pa.scalar(None, pa.string()))
+    return pd.Series(cleaned.to_pandas().to_numpy(), index=uuids.index, dtype=object)
+
+
+def normalize_actions(actions):
+    """
+    Lowercase and trim actions, skipping the copy when they are already normalized
+
+    Args:
+        actions: pandas.Series of raw action values
+
+    Returns:
+        pandas.Series: Categorical of normalized actions
+    """
+    arr = pa.array(actions.astype('string'))
+    # One read-only scan; clean input (the common case) is never copied
+    if pc.any(pc.match_substring_regex(arr, ACTION_NEEDS_NORMALIZING)).as_py():
+        arr = pc.utf8_lower(pc.utf8_trim_whitespace(arr))
+    return pd.Series(arr.dictionary_encode().to_pandas().array, index=actions.index, name=actions.name)
+
+
 def extract_episode_number(episode_id):
     """
     Extract only the number from episode ID
@@ -132,7 +251,7 @@ def extract_episode_number(episode_id):
     episode_id = str(episode_id).strip()
 
     # Extract numbers from strings like "episode-61", "ep_123", etc.
-    match = re.search(r'(\d+)', episode_id)
+    match = EPISODE_RE.search(episode_id)
     if match:
         return match.group(1)
 
@@ -149,35 +268,48 @@ def clean_file(input_path):
     Returns:
         pandas.DataFrame: Cleaned dataframe
     """
-    # Infer column names based on file format
-    # Format: timestamp|user_id|action|episode_id
-    column_names = ['timestamp', 'user_id', 'action', 'episode_id']
-
-    # Read file
-    df = pd.read_csv(input_path, delimiter="|", header=None, names=column_names)
-    original_row_count = len(df)
+    # Read file with Arrow's multithreaded parser using the fixed raw layout
+    skipped_rows = []
+    table = pacsv.read_csv(
+        input_path,
+        read_options=RAW_READ_OPTIONS,
+        parse_options=pacsv.ParseOptions(
+            delimiter="|",
+            # Rows with the wrong number of fields are dropped instead of failing the file
+            invalid_row_handler=lambda row: skipped_rows.append(row.number) or 'skip'
+        ),
+        convert_options=RAW_CONVERT_OPTIONS
+    )
+    df = table.to_pandas()
+    original_row_count = len(df) + len(skipped_rows)
+    if skipped_rows:
+        logger.warning(f"Skipped {len(skipped_rows)} malformed rows in {os.path.basename(input_path)}")
     logger.info(f"Read {original_row_count} rows from {os.path.basename(input_path)}")
 
     # Clean data
     # 1. Validate and standardize timestamps
-    df['timestamp'] = df['timestamp'].apply(validate_timestamp)
+    timestamps = standardize_timestamps(df['timestamp'])
 
     # 2. Validate UUIDs
-    df['user_id'] = df['user_id'].apply(validate_uuid)
+    user_ids = standardize_uuids(df['user_id'])
 
-    # 3. Clean actions (lowercase and remove spaces)
-    if 'action' in df.columns:
-        df['action'] = df['action'].str.lower().str.strip()
+    # 3. Filter out rows with invalid data in one pass over both masks;
+    # the remaining steps only touch the rows that are kept
+    valid = (timestamps.notna() & user_ids.notna()).to_numpy()
+    df_clean = df.loc[valid].reset_index(drop=True)
+    df_clean['timestamp'] = timestamps.to_numpy()[valid]
+    df_clean['user_id'] = user_ids.to_numpy()[valid]
 
-    # 4. Clean episode IDs
-    if 'episode_id' in df.columns:
-        df['episode_id'] = df['episode_id'].apply(extract_episode_number)
+    # 4. Clean actions (lowercase and remove spaces); the layout always has this column
+    df_clean['action'] = normalize_actions(df_clean['action'])
 
-    # 5. Filter out rows with invalid data
-    df_clean = df.dropna(subset=['timestamp', 'user_id'])
+    # 5. Clean episode IDs
+    # Vectorized extract_episode_number: keep the digits, or the ID itself if it has none
+    episode_ids = df_clean['episode_id'].astype('string').str.strip()
+    df_clean['episode_id'] = episode_ids.str.extract(EPISODE_RE.pattern, expand=False).fillna(episode_ids)
 
     # 6. Add metadata columns
-    df_clean['file_source'] = os.path.basename(input_path)
+    df_clean['file_source'] = pd.Categorical([os.path.basename(input_path)] * len(df_clean))
     df_clean['processed_at'] = datetime.now().isoformat()
 
     cleaned_row_count = len(df_clean)
@@ -189,14 +321,89 @@ def clean_file(input_path):
     return df_clean
 
 
-def clean_data(input_dir, output_dir, combined_output=True):
+def write_cleaned(df, output_path, output_format="parquet"):
+    """
+    Save cleaned data as Parquet (default) or CSV, both written by Arrow
+
+    Args:
+        df: Cleaned dataframe
+        output_path: Destination file path
+        output_format: 'parquet' or 'csv'
+    """
+    table = pa.Table.from_pandas(df, schema=CLEANED_SCHEMA, preserve_index=False)
+    if output_format == "parquet":
+        pq.write_table(table, output_path, compression='snappy')
+    else:
+        pacsv.write_csv(table, output_path, write_options=pacsv.WriteOptions(include_header=True))
+
+
+def _clean_and_write(input_path, output_dir, output_format="parquet"):
+    """
+    Clean one file and save it; runs in a worker process
+
+    Args:
+        input_path: Path to input file
+        output_dir: Directory to save the cleaned file
+        output_format: 'parquet' or 'csv'
+
+    Returns:
+        tuple: (output_path, row_count) of the saved file; the rows stay in the worker
+    """
+    file_name = os.path.basename(input_path)
+    if output_format == "parquet":
+        file_name = f"{os.path.splitext(file_name)[0]}.parquet"
+    output_path = os.path.join(output_dir, f"clean_{file_name}")
+
+    # Clean file
+    df_clean = clean_file(input_path)
+
+    # Save individual cleaned file
+    write_cleaned(df_clean, output_path, output_format)
+    return output_path, len(df_clean)
+
+
+def _append_to_combined(combined_writer, combined_path, cleaned_path, output_format="parquet"):
+    """
+    Stream a saved cleaned file onto the end of the combined file
+
+    Parquet is copied batch by batch; a CSV file is copied as bytes without its
+    header line, since every file is written by the same Arrow writer and schema.
+
+    Args:
+        combined_writer: Writer returned by the previous call, or None for the first file
+        combined_path: Path of the combined file
+        cleaned_path: Path of the cleaned file to append
+        output_format: 'parquet' or 'csv'
+
+    Returns:
+        object: Writer (ParquetWriter or binary file) to pass to the next call and close at the end
     """
-    Clean all txt files in the input directory and optionally create a combined CSV
+    if output_format == "parquet":
+        if combined_writer is None:
+            combined_writer = pq.ParquetWriter(combined_path, CLEANED_SCHEMA, compression='snappy')
+        for batch in pq.ParquetFile(cleaned_path).iter_batches():
+            combined_writer.write_batch(batch)
+        return combined_writer
+
+    with open(cleaned_path, 'rb') as cleaned_file:
+        if combined_writer is None:
+            combined_writer = open(combined_path, 'wb')
+        else:
+            cleaned_file.readline()
+        shutil.copyfileobj(cleaned_file, combined_writer)
+    return combined_writer
+
+
+def clean_data(input_dir, output_dir, combined_output=True, max_workers=None, output_format="parquet"):
+    """
+    Clean all txt files in the input directory and optionally create a combined file
 
     Args:
         input_dir: Directory containing raw txt files
         output_dir: Directory to save cleaned files
-        combined_output: Whether to generate a combined CSV file
+        combined_output: Whether to generate a combined file
+        max_workers: Number of worker processes (default: one per CPU, at most one per file)
+        output_format: 'parquet' (default) or 'csv' for the cleaned files
 
     Returns:
         dict: Summary of cleaning process
@@ -217,37 +424,43 @@ def clean_data(input_dir, output_dir, combined_output=True):
         total_rows = 0
         successful_files = 0
         failed_files = []
-        all_cleaned_data = pd.DataFrame()
-
-        # Process each file
-        for input_path in txt_files:
-            try:
-                file_name = os.path.basename(input_path)
-                output_path = os.path.join(output_dir, f"clean_{file_name}")
-
-                # Clean file
-                df_clean = clean_file(input_path)
+        combined_rows = 0
+        combined_path = os.path.join(output_dir, f"combined_podcast_data.{output_format}")
+        combined_writer = None
 
-                # Save individual cleaned file
-                df_clean.to_csv(output_path, index=False)
+        # Files are independent, so each one is cleaned in its own process;
+        # spawn keeps the workers clean even if the caller already runs threads
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(txt_files)))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {input_path: pool.submit(_clean_and_write, input_path, output_dir, output_format)
+                       for input_path in txt_files}
 
-                # Collect for combined output
-                if combined_output:
-                    all_cleaned_data = pd.concat([all_cleaned_data, df_clean], ignore_index=True)
-
-                total_rows += len(df_clean)
-                successful_files += 1
-
-            except Exception as e:
-                failed_files.append(os.path.basename(input_path))
-                stack_trace = traceback.format_exc()
-                logger.error(f"Failed to process file {input_path}: {e}\n{stack_trace}")
-
-        # Save combined CSV if requested
-        if combined_output and not all_cleaned_data.empty:
-            combined_path = os.path.join(output_dir, "combined_podcast_data.csv")
-            all_cleaned_data.to_csv(combined_path, index=False)
-            logger.info(f"Saved combined data to {combined_path} ({len(all_cleaned_data)} total rows)")
+            try:
+                # Collect in input order so the combined output is deterministic
+                for input_path, future in futures.items():
+                    try:
+                        output_path, row_count = future.result()
+
+                        # Workers return only where they saved each file, and the combined
+                        # file is streamed from there, so no cleaned rows are held here
+                        if combined_output and row_count:
+                            combined_writer = _append_to_combined(combined_writer, combined_path,
+                                                                  output_path, output_format)
+                            combined_rows += row_count
+
+                        total_rows += row_count
+                        successful_files += 1
+
+                    except Exception as e:
+                        failed_files.append(os.path.basename(input_path))
+                        stack_trace = traceback.format_exc()
+                        logger.error(f"Failed to process file {input_path}: {e}\n{stack_trace}")
+            finally:
+                if combined_writer is not None:
+                    combined_writer.close()
+
+        if combined_rows:
+            logger.info(f"Saved combined data to {combined_path} ({combined_rows} total rows)")
 
         # Generate summary
         summary = {
@@ -256,7 +469,7 @@ def clean_data(input_dir, output_dir, combined_output=True):
             "rows_processed": total_rows,
             "failed_files": failed_files,
             "timestamp": datetime.now().isoformat(),
-            "combined_output_created": combined_output and not all_cleaned_data.empty
+            "combined_output_created": combined_rows > 0
         }
 
         # Save summary
@@ -281,7 +494,9 @@ if __name__ == "__main__":
     parser.add_argument('--config', default='../../config/config.yaml', help='Path to config file')
     parser.add_argument('--input-dir', required=True, help='Directory containing raw txt files')
     parser.add_argument('--output-dir', required=True, help='Directory to save cleaned files')
-    parser.add_argument('--no-combined', action='store_true', help='Skip creating combined CSV output')
+    parser.add_argument('--no-combined', action='store_true', help='Skip creating combined output')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet',
+                        help='Output format for cleaned files')
     args = parser.parse_args()
 
     try:
@@ -292,7 +507,8 @@ if __name__ == "__main__":
             logger.warning("Could not load config file. Using command line arguments only.")
 
         # Execute cleaning process
-        clean_data(args.input_dir, args.output_dir, combined_output=not args.no_combined)
+        clean_data(args.input_dir, args.output_dir, combined_output=not args.no_combined,
+                   output_format=args.format)
     except Exception as e:
         logger.critical(f"Critical error in main execution: {e}")
         traceback.print_exc()
@@ -6,18 +6,30 @@ like Parquet, Avro, and Iceberg for more efficient processing and querying.
 """
 
 import os
-import pandas as pd
+import re
+import mmap
+import hashlib
+from collections import defaultdict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import logging
 import yaml
 import glob
 from pathlib import Path
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
 import pyarrow.dataset as ds
 from datetime import datetime
 import json
 import shutil
 
+from scripts.processing.data_cleaner import CLEANED_SCHEMA
+
+logger = logging.getLogger(__name__)
+
 # Try importing optional libraries
 try:
     import fastavro
@@ -25,7 +37,23 @@ try:
     AVRO_AVAILABLE = True
 except ImportError:
     AVRO_AVAILABLE = False
-    logging.warning("fastavro library not found. Avro conversion will not be available.")
+    logger.warning("fastavro library not found. Avro conversion will not be available.")
+
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    logger.warning("xxhash library not found. Falling back to blake2b for duplicate file detection.")
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson library not found. Falling back to json for writing JSON files.")
 
 try:
     import pyiceberg
@@ -38,14 +66,32 @@ try:
     ICEBERG_AVAILABLE = True
 except ImportError:
     ICEBERG_AVAILABLE = False
-    logging.warning("pyiceberg library not found. Iceberg conversion will not be available.")
+    logger.warning("pyiceberg library not found. Iceberg conversion will not be available.")
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
+
+# Parquet encoding for converted data: dictionary pages and min/max statistics let
+# readers prune row groups; zstd level 3 keeps files small at a low CPU cost
+PARQUET_WRITE_OPTIONS = ds.ParquetFileFormat().make_write_options(
+    compression='zstd',
+    compression_level=3,
+    use_dictionary=True,
+    write_statistics=True,
+    data_page_size=1 << 20
+)
+ROWS_PER_GROUP = 128 * 1024
+
+# Cleaned files are scanned concurrently on Arrow's I/O and CPU thread pools; the
+# readahead is how many files are opened and parsed at once
+SCAN_OPTIONS = dict(use_threads=True, fragment_readahead=min(32, (os.cpu_count() or 1) * 2))
+
+# Columns holding timestamps: "timestamp", "date" or names built from them (e.g. "pub_date"),
+# but not names that merely contain the letters (e.g. "update_count")
+_TS_COLUMN_RE = re.compile(r'(?:^|_)(?:timestamp|date)(?:_|$)', re.IGNORECASE)
 
 
 def load_config(config_path):
@@ -68,120 +114,258 @@ def load_config(config_path):
         raise
 
 
-def read_cleaned_files(input_dir, file_pattern="clean_*.txt"):
+def _is_ts(column_name):
     """
-    Read all cleaned files into a single DataFrame
+    Check whether a column holds timestamps, judged by its name
+
+    Args:
+        column_name: Column name
+
+    Returns:
+        bool: True for timestamp/date columns
+    """
+    return _TS_COLUMN_RE.search(column_name) is not None
+
+
+def _file_digest(path):
+    """
+    Hash a file's contents through a read-only memory map
+
+    Args:
+        path: File to hash
+
+    Returns:
+        str: Hex digest (xxh3_64, or blake2b without xxhash)
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_64(mm).hexdigest()
+        return hashlib.blake2b(mm, digest_size=16).hexdigest()
+
+
+def drop_duplicate_files(file_paths):
+    """
+    Drop files whose contents duplicate an earlier file in the list
+
+    Only files that share their size with another file are hashed, so
+    distinct files usually cost a single stat each.
+
+    Args:
+        file_paths: File paths in priority order
+
+    Returns:
+        list: The first path of every distinct file, in the original order
+    """
+    by_size = defaultdict(list)
+    for path in file_paths:
+        by_size[os.path.getsize(path)].append(path)
+
+    duplicates = set()
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        seen = set()
+        for path in paths:
+            # Empty files cannot be memory-mapped, and are all equal anyway
+            digest = _file_digest(path) if size else ''
+            if digest in seen:
+                duplicates.add(path)
+            seen.add(digest)
+
+    if duplicates:
+        logger.warning(f"Skipping {len(duplicates)} cleaned files that duplicate other files")
+    return [path for path in file_paths if path not in duplicates]
+
+
+def read_cleaned_files(input_dir, file_pattern="clean_*"):
+    """
+    Open all cleaned files as a single Arrow dataset
+
+    Files are scanned lazily in record batches rather than loaded into memory.
+    Parquet outputs are preferred; CSV outputs are read with every cleaned
+    column kept as a string, as the cleaner wrote them. Files with identical
+    contents (e.g. left behind by a rerun) are read only once.
 
     Args:
         input_dir: Directory containing cleaned files
-        file_pattern: Pattern to match cleaned files
+        file_pattern: Pattern to match cleaned files (Parquet or CSV by extension)
 
     Returns:
-        DataFrame: Combined data from all cleaned files
+        pyarrow.dataset.Dataset: Dataset over all cleaned files, or None if none were found
     """
     try:
         # Find all cleaned files
-        file_paths = glob.glob(os.path.join(input_dir, file_pattern))
+        file_paths = sorted(glob.glob(os.path.join(input_dir, file_pattern)))
 
         if not file_paths:
             logger.warning(f"No files matching '{file_pattern}' found in {input_dir}")
             return None
 
-        logger.info(f"Found {len(file_paths)} cleaned files to process")
-
-        # Read and combine files
-        dataframes = []
-        for file_path in file_paths:
-            try:
-                df = pd.read_csv(file_path)
-                dataframes.append(df)
-            except Exception as e:
-                logger.error(f"Error reading file {file_path}: {e}")
-
-        if not dataframes:
-            logger.warning("No data could be read from cleaned files")
-            return None
-
-        # Combine all dataframes
-        combined_df = pd.concat(dataframes, ignore_index=True)
-        logger.info(f"Combined {len(dataframes)} files into a DataFrame with {len(combined_df)} rows")
+        parquet_paths = [path for path in file_paths if path.endswith('.parquet')]
+        if parquet_paths:
+            if len(parquet_paths) < len(file_paths):
+                logger.warning(f"Ignoring {len(file_paths) - len(parquet_paths)} non-Parquet cleaned files")
+            dataset = ds.dataset(drop_duplicate_files(parquet_paths), format="parquet")
+        else:
+            csv_format = ds.CsvFileFormat(convert_options=pacsv.ConvertOptions(
+                column_types={field.name: pa.string() for field in CLEANED_SCHEMA},
+                strings_can_be_null=True
+            ))
+            dataset = ds.dataset(drop_duplicate_files(file_paths), format=csv_format)
 
-        return combined_df
+        logger.info(f"Found {len(dataset.files)} cleaned files to process")
+        return dataset
 
     except Exception as e:
         logger.error(f"Error reading cleaned files: {e}")
         raise
 
 
+def read_cleaned_dataframe(input_dir):
+    """
+    Read all cleaned files into a single DataFrame
+
+    Args:
+        input_dir: Directory containing cleaned files
+
+    Returns:
+        DataFrame: Combined data from all cleaned files, or None if none were found
+    """
+    dataset = read_cleaned_files(input_dir)
+    if dataset is None:
+        return None
+
+    # Convert once at the boundary, releasing Arrow buffers as columns are converted
+    df = dataset.to_table(**SCAN_OPTIONS).to_pandas(self_destruct=True)
+    logger.info(f"Combined {len(dataset.files)} files into a DataFrame with {len(df)} rows")
+    return df
+
+
+def open_cleaned_data(input_dir, arrow_table_path=None):
+    """
+    Open cleaned data from an Arrow IPC scratch file if given, else from input_dir
+
+    Args:
+        input_dir: Directory containing cleaned files
+        arrow_table_path: Arrow IPC file written by write_cleaned_scratch (optional)
+
+    Returns:
+        pyarrow.dataset.Dataset: Dataset over the cleaned data, or None if none was found
+    """
+    if arrow_table_path is None:
+        return read_cleaned_files(input_dir)
+
+    # Memory-mapped, so the table's buffers point into the file rather than being copied
+    table = pa.ipc.open_file(pa.memory_map(arrow_table_path)).read_all()
+    return ds.dataset(table)
+
+
+def write_cleaned_scratch(input_dir, scratch_path):
+    """
+    Read the cleaned files once and persist them as an Arrow IPC file
+
+    Args:
+        input_dir: Directory containing cleaned files
+        scratch_path: Path of the Arrow IPC file to write
+
+    Returns:
+        bool: True if a file was written, False if there was no cleaned data
+    """
+    dataset = read_cleaned_files(input_dir)
+    if dataset is None:
+        return False
+
+    # The IPC file format needs one dictionary per column across all batches
+    table = dataset.to_table(**SCAN_OPTIONS).unify_dictionaries()
+    with pa.OSFile(scratch_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return True
+
+
 def convert_to_parquet(input_dir, output_dir, silver_bucket=None, silver_prefix=None,
-                       partition_cols=None):
+                       partition_cols=None, arrow_table_path=None, with_schema=False):
     """
     Convert cleaned data to Parquet format
 
+    Record batches are streamed from the cleaned files straight into the
+    Parquet writer; timestamps and the date partition are computed by Arrow.
+
     Args:
         input_dir: Directory containing cleaned data
         output_dir: Directory to save Parquet files
         silver_bucket: S3 bucket for silver layer (optional)
         silver_prefix: S3 prefix for silver layer (optional)
         partition_cols: Columns to partition by (optional)
+        arrow_table_path: Arrow IPC file already holding the cleaned data; read
+            instead of input_dir when given (optional)
+        with_schema: Also return the Arrow schema of the written data
 
     Returns:
-        list: Paths to generated Parquet files
+        list: Paths to generated Parquet files, or (paths, schema) if with_schema;
+            the schema is None when there was no data
     """
     try:
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
 
-        # Read cleaned data
-        df = read_cleaned_files(input_dir)
+        # Open cleaned data
+        dataset = open_cleaned_data(input_dir, arrow_table_path)
 
-        if df is None or len(df) == 0:
+        if dataset is None or dataset.count_rows() == 0:
             logger.warning("No data to convert to Parquet")
-            return []
+            return ([], None) if with_schema else []
 
-        # Set default partition columns if none provided
-        if partition_cols is None:
-            # Extract date from timestamp for partitioning
-            if 'timestamp' in df.columns:
-                df['date'] = pd.to_datetime(df['timestamp']).dt.date
-                partition_cols = ['date']
-            else:
-                partition_cols = []
+        # Parse timestamp columns with Arrow's cast kernel (ISO-8601, optional fractional
+        # seconds) while scanning
+        columns = {
+            field.name: ds.field(field.name).cast(pa.timestamp('us')) if _is_ts(field.name) else ds.field(field.name)
+            for field in dataset.schema
+        }
 
         # Define output path
         parquet_dir = os.path.join(output_dir, 'parquet')
         os.makedirs(parquet_dir, exist_ok=True)
 
-        # Convert timestamp to datetime if present
-        for col in df.columns:
-            if 'timestamp' in col.lower() or 'date' in col.lower():
-                try:
-                    df[col] = pd.to_datetime(df[col])
-                except Exception as e:
-                    logger.warning(f"Could not convert column {col} to datetime: {e}")
+        scanner = dataset.scanner(columns=columns, **SCAN_OPTIONS)
+        source = scanner
+        output_schema = scanner.projected_schema
+
+        # Set default partition columns if none provided
+        if partition_cols is None:
+            # Extract date from timestamp for partitioning
+            if 'timestamp' in columns:
+                # Derived from each batch's already parsed timestamps; a second projected
+                # expression would parse the timestamp strings all over again
+                output_schema = output_schema.append(pa.field('date', pa.date32()))
+
+                def with_date(batches):
+                    for batch in batches:
+                        date = pc.cast(batch.column('timestamp'), pa.date32())
+                        yield pa.RecordBatch.from_arrays(batch.columns + [date], schema=output_schema)
 
-        # Convert to PyArrow Table
-        table = pa.Table.from_pandas(df)
+                source = pa.RecordBatchReader.from_batches(output_schema, with_date(scanner.to_batches()))
+                partition_cols = ['date']
+            else:
+                partition_cols = []
 
         # Write to Parquet (partitioned if partition_cols is provided)
-        if partition_cols and len(partition_cols) > 0:
+        if partition_cols:
             logger.info(f"Writing partitioned Parquet files by {partition_cols}")
-            pq.write_to_dataset(
-                table,
-                root_path=parquet_dir,
-                partition_cols=partition_cols
-            )
         else:
-            logger.info("Writing single Parquet file")
-            parquet_path = os.path.join(parquet_dir, 'podcast_streams.parquet')
-            pq.write_table(table, parquet_path)
-
-        # Get list of created files
+            logger.info("Writing unpartitioned Parquet files")
+        # Collect each file's path as the writer closes it, rather than walking the output afterwards
         parquet_files = []
-        for root, _, files in os.walk(parquet_dir):
-            for file in files:
-                if file.endswith('.parquet'):
-                    parquet_files.append(os.path.join(root, file))
+        ds.write_dataset(
+            source,
+            base_dir=parquet_dir,
+            format="parquet",
+            file_options=PARQUET_WRITE_OPTIONS,
+            partitioning=partition_cols or None,
+            partitioning_flavor="hive" if partition_cols else None,
+            max_rows_per_group=ROWS_PER_GROUP,
+            existing_data_behavior="overwrite_or_ignore",
+            file_visitor=lambda written_file: parquet_files.append(written_file.path)
+        )
 
         logger.info(f"Created {len(parquet_files)} Parquet files in {parquet_dir}")
 
@@ -199,20 +383,60 @@ def convert_to_parquet(input_dir, output_dir, silver_bucket=None, silver_prefix=
             except Exception as e:
                 logger.error(f"Error uploading to S3: {e}")
 
-        return parquet_files
+        return (parquet_files, output_schema) if with_schema else parquet_files
 
     except Exception as e:
         logger.error(f"Error converting to Parquet: {e}")
         raise
 
 
-def convert_to_avro(input_dir, output_dir):
+def _resolve_arrow_type(name):
+    """
+    Arrow type for a cleaned column, matching the Iceberg field types
+
+    Args:
+        name: Column name
+
+    Returns:
+        pyarrow.DataType: Type to build the column with
+    """
+    if _is_ts(name):
+        return pa.timestamp('us')
+    if name == 'episode_id':
+        return pa.int32()
+    return pa.large_string()
+
+
+@lru_cache(maxsize=16)
+def _build_parsed_avro_schema(columns_signature):
+    """
+    Build and parse the Avro schema for a set of columns, once per signature
+
+    Args:
+        columns_signature: Tuple of (column name, Avro type) pairs
+
+    Returns:
+        dict: Schema already parsed by fastavro.parse_schema
+    """
+    fields = [{'name': name, 'type': ['null', avro_type], 'default': None}
+              for name, avro_type in columns_signature]
+    return fastavro.parse_schema({
+        'namespace': 'podcast.streams',
+        'type': 'record',
+        'name': 'Stream',
+        'fields': fields
+    })
+
+
+def convert_to_avro(input_dir, output_dir, arrow_table_path=None):
     """
     Convert cleaned data to Avro format
 
     Args:
         input_dir: Directory containing cleaned data
         output_dir: Directory to save Avro files
+        arrow_table_path: Arrow IPC file already holding the cleaned data; read
+            instead of input_dir when given (optional)
 
     Returns:
         list: Paths to generated Avro files
@@ -226,47 +450,37 @@ def convert_to_avro(input_dir, output_dir):
         avro_dir = os.path.join(output_dir, 'avro')
         os.makedirs(avro_dir, exist_ok=True)
 
-        # Read cleaned data
-        df = read_cleaned_files(input_dir)
+        # Open cleaned data
+        dataset = open_cleaned_data(input_dir, arrow_table_path)
 
-        if df is None or len(df) == 0:
+        if dataset is None or dataset.count_rows() == 0:
             logger.warning("No data to convert to Avro")
             return []
 
-        # Convert timestamps to strings for Avro compatibility
-        for col in df.columns:
-            if 'timestamp' in col.lower() or 'date' in col.lower():
-                try:
-                    df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
-                except Exception as e:
-                    logger.warning(f"Could not convert column {col} for Avro: {e}")
-
-        # Define Avro schema with proper types
-        fields = []
-        for field in df.columns:
-            if field == 'episode_id':
-                fields.append({'name': field, 'type': ['null', 'int'], 'default': None})
+        # Convert timestamps to strings for Avro compatibility and type episode_id,
+        # both with Arrow compute expressions applied while scanning
+        columns = {}
+        for name in dataset.schema.names:
+            if _is_ts(name):
+                columns[name] = pc.strftime(ds.field(name).cast(pa.timestamp('us')), format='%Y-%m-%dT%H:%M:%S')
+            elif name == 'episode_id':
+                columns[name] = ds.field(name).cast(pa.int32())
             else:
-                fields.append({'name': field, 'type': ['null', 'string'], 'default': None})
+                columns[name] = ds.field(name)
 
-        schema = {
-            'namespace': 'podcast.streams',
-            'type': 'record',
-            'name': 'Stream',
-            'fields': fields
-        }
+        # Define Avro schema with proper types; parsed once per column layout
+        signature = tuple((name, 'int' if name == 'episode_id' else 'string') for name in columns)
+        schema = _build_parsed_avro_schema(signature)
 
-        # Ensure episode_id is properly typed
-        if 'episode_id' in df.columns:
-            df['episode_id'] = df['episode_id'].astype(int)
-
-        # Convert DataFrame to list of records
-        records = df.to_dict('records')
+        # Stream records batch by batch instead of materializing every row at once
+        def records():
+            for batch in dataset.scanner(columns=columns, batch_size=65536, **SCAN_OPTIONS).to_batches():
+                yield from batch.to_pylist()
 
         # Write to Avro file
         avro_path = os.path.join(avro_dir, 'podcast_streams.avro')
         with open(avro_path, 'wb') as out:
-            fastavro.writer(out, schema, records)
+            fastavro.writer(out, schema, records())
 
         logger.info(f"Created Avro file at {avro_path}")
         return [avro_path]
@@ -276,7 +490,7 @@ def convert_to_avro(input_dir, output_dir):
         return []
 
 
-def convert_to_iceberg(input_dir, output_dir, warehouse_path=None):
+def convert_to_iceberg(input_dir, output_dir, warehouse_path=None, arrow_table_path=None):
     """
     Convert cleaned data to Apache Iceberg format
 
@@ -284,6 +498,8 @@ def convert_to_iceberg(input_dir, output_dir, warehouse_path=None):
         input_dir: Directory containing cleaned data
         output_dir: Directory to save Iceberg tables
         warehouse_path: Optional path for the Iceberg warehouse
+        arrow_table_path: Arrow IPC file already holding the cleaned data; read
+            instead of input_dir when given (optional)
 
     Returns:
         str: Path to generated Iceberg table
@@ -296,7 +512,6 @@ def convert_to_iceberg(input_dir, output_dir, warehouse_path=None):
             NestedField, StringType, TimestampType, IntegerType
         )
         from pyiceberg.partitioning import PartitionSpec
-        import pandas as pd
         import os
         import uuid
 
@@ -308,17 +523,17 @@ def convert_to_iceberg(input_dir, output_dir, warehouse_path=None):
         if warehouse_path is None:
             warehouse_path = os.path.abspath(iceberg_dir)
 
-        # Read cleaned data
-        df = read_cleaned_files(input_dir)
+        # Open cleaned data
+        dataset = open_cleaned_data(input_dir, arrow_table_path)
 
-        if df is None or len(df) == 0:
+        if dataset is None or dataset.count_rows() == 0:
             logger.warning("No data to convert to Iceberg")
             return ""
 
-        # Define the Iceberg schema based on the DataFrame columns
+        # Define the Iceberg schema based on the dataset columns
         fields = []
-        for i, col in enumerate(df.columns):
-            if col == 'timestamp' or 'date' in col.lower():
+        for i, col in enumerate(dataset.schema.names):
+            if _is_ts(col):
                 fields.append(NestedField(i + 1, col, TimestampType(), required=False))
             elif col == 'episode_id':
                 fields.append(NestedField(i + 1, col, IntegerType(), required=False))
@@ -356,50 +571,43 @@ def convert_to_iceberg(input_dir, output_dir, warehouse_path=None):
             properties={"format-version": "2"}
         )
 
-        # Convert data types as needed
-        for col in df.columns:
-            if col == 'episode_id':
-                df[col] = df[col].astype(int)
-            elif 'timestamp' in col.lower() or 'date' in col.lower():
-                df[col] = pd.to_datetime(df[col])
-
         # Write data to the table
         table_path = f"{warehouse_path}/{namespace}/{table_name}"
 
-        # Use PyArrow to write the data (more efficient for Iceberg)
-        try:
-            import pyarrow as pa
-            import pyarrow.parquet as pq
-
-            # Convert to PyArrow table
-            arrow_table = pa.Table.from_pandas(df)
-
-            # Write to parquet file in the data directory
-            data_dir = f"{table_path}/data"
-            os.makedirs(data_dir, exist_ok=True)
-            parquet_path = f"{data_dir}/part-0.parquet"
-            pq.write_table(
-                arrow_table,
-                parquet_path,
-                compression="snappy"
-            )
-
-            # Register the new file with the table
-            # Note: In a full implementation, you'd use the Iceberg API to add the file
-            # but for demonstration, we're just creating the file and refreshing the table
-            logger.info(f"Wrote data file to {parquet_path}")
-
-            # Refresh table metadata
-            table.refresh()
-
-        except ImportError:
-            logger.warning("PyArrow not available, falling back to less efficient method")
-            # Fallback to pandas-based writing if PyArrow is not available
-            parquet_path = f"{table_path}/data/part-0.parquet"
-            os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
-            df.to_parquet(parquet_path, compression="snappy")
-            logger.info(f"Wrote data file to {parquet_path}")
-            table.refresh()
+        # Read straight into Arrow with the types the Iceberg schema declares; the
+        # casts run while scanning, so the data never goes through pandas.
+        # Older pyiceberg releases have no Schema.as_arrow, so build the equivalent schema there
+        if hasattr(schema, 'as_arrow'):
+            arrow_schema = schema.as_arrow()
+        else:
+            arrow_schema = pa.schema([(col, _resolve_arrow_type(col)) for col in dataset.schema.names])
+        arrow_table = dataset.to_table(
+            columns={field.name: ds.field(field.name).cast(field.type) for field in arrow_schema},
+            **SCAN_OPTIONS
+        ).cast(arrow_schema)
+
+        # Write to parquet file in the data directory
+        data_dir = f"{table_path}/data"
+        os.makedirs(data_dir, exist_ok=True)
+        parquet_path = f"{data_dir}/part-0.parquet"
+        # Same encoding as the Parquet conversion (see PARQUET_WRITE_OPTIONS)
+        pq.write_table(
+            arrow_table,
+            parquet_path,
+            compression="zstd",
+            compression_level=3,
+            use_dictionary=True,
+            write_statistics=True,
+            data_page_size=1 << 20
+        )
+
+        # Register the new file with the table
+        # Note: In a full implementation, you'd use the Iceberg API to add the file
+        # but for demonstration, we're just creating the file and refreshing the table
+        logger.info(f"Wrote data file to {parquet_path}")
+
+        # Refresh table metadata
+        table.refresh()
 
         logger.info(f"Created Iceberg table at {table_path}")
         return table_path
@@ -426,7 +634,8 @@ def convert_to_formats(input_dir, output_dir, formats=None, silver_bucket=None,
         silver_prefix: S3 prefix for silver layer (optional)
 
     Returns:
-        dict: Paths to generated files by format
+        dict: Paths to generated files by format; when Parquet is written, 'parquet_schema'
+            also holds the Arrow schema of that data (None if there was none)
     """
     try:
         # Default to Parquet if no formats specified
@@ -435,31 +644,52 @@ def convert_to_formats(input_dir, output_dir, formats=None, silver_bucket=None,
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
 
-        results = {}
-
-        # Convert to each format
+        # Conversions to run, each reading the same cleaned input
+        jobs = {}
         if 'parquet' in formats:
-            parquet_files = convert_to_parquet(
+            jobs['parquet'] = (convert_to_parquet, dict(
                 input_dir=input_dir,
                 output_dir=output_dir,
                 silver_bucket=silver_bucket,
-                silver_prefix=silver_prefix
-            )
-            results['parquet'] = parquet_files
+                silver_prefix=silver_prefix,
+                with_schema=True
+            ))
 
         if 'avro' in formats and AVRO_AVAILABLE:
-            avro_files = convert_to_avro(
-                input_dir=input_dir,
-                output_dir=output_dir
-            )
-            results['avro'] = avro_files
+            jobs['avro'] = (convert_to_avro, dict(input_dir=input_dir, output_dir=output_dir))
 
         if 'iceberg' in formats and ICEBERG_AVAILABLE:
-            iceberg_metadata = convert_to_iceberg(
-                input_dir=input_dir,
-                output_dir=output_dir
-            )
-            results['iceberg'] = iceberg_metadata
+            jobs['iceberg'] = (convert_to_iceberg, dict(input_dir=input_dir, output_dir=output_dir))
+
+        # The formats are independent, so with more than one each runs in its own process
+        # (spawned, as in data_cleaner) and the slow Avro record loop does not hold up the rest.
+        # The cleaned files are then parsed once into an Arrow IPC scratch file that every
+        # worker memory-maps, instead of each worker parsing them again
+        results = {}
+        if len(jobs) > 1:
+            scratch_path = os.path.join(output_dir, '.cleaned_data.arrow')
+            try:
+                if write_cleaned_scratch(input_dir, scratch_path):
+                    for _, kwargs in jobs.values():
+                        kwargs['arrow_table_path'] = scratch_path
+
+                with ProcessPoolExecutor(max_workers=len(jobs),
+                                         mp_context=multiprocessing.get_context("spawn")) as pool:
+                    futures = {fmt: pool.submit(func, **kwargs) for fmt, (func, kwargs) in jobs.items()}
+                    # Collect in the order formats were requested so the results are deterministic
+                    for fmt, future in futures.items():
+                        results[fmt] = future.result()
+            finally:
+                if os.path.exists(scratch_path):
+                    os.remove(scratch_path)
+        else:
+            for fmt, (func, kwargs) in jobs.items():
+                results[fmt] = func(**kwargs)
+
+        # The Parquet job also reports the schema it wrote, so callers need not read it back
+        parquet_schema = None
+        if 'parquet' in results:
+            results['parquet'], parquet_schema = results['parquet']
 
         # Generate a summary report
         summary = {
@@ -471,10 +701,16 @@ def convert_to_formats(input_dir, output_dir, formats=None, silver_bucket=None,
 
         # Save summary
         summary_path = os.path.join(output_dir, 'conversion_summary.json')
-        with open(summary_path, 'w') as f:
-            json.dump(summary, f, indent=2)
+        if ORJSON_AVAILABLE:
+            with open(summary_path, 'wb') as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC))
+        else:
+            with open(summary_path, 'w') as f:
+                json.dump(summary, f, indent=2)
 
         logger.info(f"Completed format conversion: {summary['file_counts']}")
+        if 'parquet' in results:
+            results['parquet_schema'] = parquet_schema
         return results
 
     except Exception as e:
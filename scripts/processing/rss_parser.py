@@ -6,127 +6,216 @@ extracts podcast metadata, episode details, and other information
 """
 
 import os
+import numpy as np
 import pandas as pd
-import xml.etree.ElementTree as ET
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import re
 import json
 
+logger = logging.getLogger(__name__)
+
+# Prefer lxml's C parser for streaming, fall back to the standard library
+try:
+    from lxml import etree
+
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+    LXML_AVAILABLE = False
+    logger.warning("lxml library not found. Falling back to xml.etree for RSS parsing.")
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson library not found. Falling back to json for writing JSON files.")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
 
+# Fully qualified iTunes tags, so child tags compare against them without resolving a prefix map
+ITUNES_NS = '{http://www.itunes.com/dtds/podcast-1.0.dtd}'
+ITUNES_AUTHOR = f'{ITUNES_NS}author'
+ITUNES_CATEGORY = f'{ITUNES_NS}category'
+ITUNES_EXPLICIT = f'{ITUNES_NS}explicit'
+ITUNES_IMAGE = f'{ITUNES_NS}image'
+ITUNES_DURATION = f'{ITUNES_NS}duration'
+ITUNES_EPISODE = f'{ITUNES_NS}episode'
+ITUNES_SEASON = f'{ITUNES_NS}season'
+
+# Child tags of channel and item elements mapped to output fields. A plain name takes the
+# child's text; a tuple of (field, attribute) pairs reads attributes of the child instead
+CHANNEL_FIELDS = {
+    'title': 'title',
+    'description': 'description',
+    'link': 'link',
+    'language': 'language',
+    'lastBuildDate': 'last_build_date',
+    ITUNES_AUTHOR: 'author',
+    ITUNES_CATEGORY: (('category', 'text'),),
+    ITUNES_EXPLICIT: 'explicit',
+    ITUNES_IMAGE: (('image', 'href'),),
+    'copyright': 'copyright',
+    'generator': 'generator',
+}
+ITEM_FIELDS = {
+    'title': 'title',
+    'description': 'description',
+    'pubDate': 'pub_date',
+    'enclosure': (('media_url', 'url'), ('media_length', 'length'), ('media_type', 'type')),
+    ITUNES_DURATION: 'duration',
+    ITUNES_EPISODE: 'episode_number',
+    ITUNES_SEASON: 'season',
+    ITUNES_EXPLICIT: 'explicit',
+    'guid': 'guid',
+}
+
+# Episode fields in output column order; duration_seconds is derived from duration
+EPISODE_COLUMNS = ('title', 'description', 'pub_date', 'pub_date_iso', 'media_url', 'media_length',
+                   'media_type', 'duration', 'episode_number', 'season', 'explicit', 'duration_seconds',
+                   'guid')
+EPISODE_INT_COLUMNS = ('episode_number', 'season')
+
+# Whole numbers as int() accepts them; 18 digits always fit in Int64
+INTEGER_RE = re.compile(r'^\s*([+\-]?\d{1,18})\s*$')
+
+# RSS dates, matched with one regex each instead of trying strptime formats in turn
+_RFC822 = re.compile(
+    r'^\w{3}, (\d{1,2}) (\w{3}) (\d{4}) (\d{2}):(\d{2}):(\d{2})(?: ([+\-]\d{4}|\w+))?$'
+)
+_ISO8601 = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(Z|[+\-]\d{2}:?\d{2})$'
+)
+_MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+           'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+# Zone names that strptime's %Z accepts; like strptime, they give a naive datetime
+_NAIVE_ZONES = {'UTC', 'GMT'}
 
-def extract_podcast_metadata(root):
-    """
-    Extract podcast-level metadata from RSS feed
+# iTunes durations: "5400" (seconds), "30:45" (mm:ss) or "1:30:45" (hh:mm:ss)
+DURATION_RE = re.compile(r'^(?:(?:(\d+):)?(\d+):)?(\d+)$')
 
-    Args:
-        root: XML root element
 
-    Returns:
-        dict: Podcast metadata
+def iter_feed_elements(xml_path):
     """
-    channel = root.find('channel')
+    Stream item and channel elements out of an RSS feed
 
-    # Define namespace for iTunes-specific elements
-    ns = {'itunes': 'http://www.itunes.com/dtds/podcast-1.0.dtd'}
+    Each item is yielded as soon as it is parsed and released right after,
+    so memory stays flat regardless of how many episodes the feed holds.
+    The channel comes last and only keeps its non-item children.
 
-    metadata = {}
+    Args:
+        xml_path: Path to RSS XML file
 
-    # Basic podcast info
-    metadata['title'] = get_element_text(channel, 'title')
-    metadata['description'] = get_element_text(channel, 'description')
-    metadata['link'] = get_element_text(channel, 'link')
-    metadata['language'] = get_element_text(channel, 'language')
-    metadata['last_build_date'] = get_element_text(channel, 'lastBuildDate')
+    Yields:
+        Element: item elements, followed by the channel element
+    """
+    if LXML_AVAILABLE:
+        for _, elem in etree.iterparse(xml_path, events=('end',), tag=('item', 'channel')):
+            yield elem
+            if elem.tag == 'item':
+                elem.clear()
+                # Drop the items that were already processed
+                previous = elem.getprevious()
+                while previous is not None and previous.tag == 'item':
+                    elem.getparent().remove(previous)
+                    previous = elem.getprevious()
+        return
+
+    channel = None
+    for event, elem in etree.iterparse(xml_path, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'channel' and channel is None:
+                channel = elem
+        elif elem.tag == 'item':
+            yield elem
+            elem.clear()
+            if channel is not None:
+                channel.remove(elem)
+        elif elem.tag == 'channel':
+            yield elem
+
+
+def get_child_fields(element, fields):
+    """
+    Read every mapped field of an element in a single pass over its children
 
-    # iTunes specific metadata
-    metadata['author'] = get_element_text(channel, 'itunes:author', ns)
-    metadata['category'] = get_element_text(channel, 'itunes:category', ns, attr='text')
-    metadata['explicit'] = get_element_text(channel, 'itunes:explicit', ns)
-    metadata['image'] = get_element_text(channel, 'itunes:image', ns, attr='href')
+    Like find(), the first matching child wins when a tag repeats.
 
-    # Additional metadata
-    metadata['copyright'] = get_element_text(channel, 'copyright')
-    metadata['generator'] = get_element_text(channel, 'generator')
+    Args:
+        element: Parent XML element
+        fields: Tag-to-field mapping such as CHANNEL_FIELDS or ITEM_FIELDS
 
-    logger.info(f"Extracted metadata for podcast: {metadata.get('title', 'Unknown')}")
-    return metadata
+    Returns:
+        dict: Every mapped field in mapping order, None where the child is missing
+    """
+    found = {}
+    for child in element:
+        field = fields.get(child.tag)
+        if field is None or child.tag in found:
+            continue
+        found[child.tag] = child
+
+    values = {}
+    for tag, field in fields.items():
+        child = found.get(tag)
+        if isinstance(field, tuple):
+            for name, attr in field:
+                values[name] = child.attrib.get(attr) if child is not None else None
+        else:
+            values[field] = child.text if child is not None else None
+    return values
 
 
-def extract_episodes(root):
+def extract_podcast_metadata(channel):
     """
-    Extract episode details from RSS feed
+    Extract podcast-level metadata from RSS feed
 
     Args:
-        root: XML root element
+        channel: XML channel element
 
     Returns:
-        list: List of episode dictionaries
+        dict: Podcast metadata
     """
-    channel = root.find('channel')
-    items = channel.findall('item')
-    ns = {'itunes': 'http://www.itunes.com/dtds/podcast-1.0.dtd'}
-
-    episodes = []
+    # Basic, iTunes specific and additional podcast info in one pass over the channel
+    metadata = get_child_fields(channel, CHANNEL_FIELDS)
 
-    for item in items:
-        episode = {}
+    logger.info(f"Extracted metadata for podcast: {metadata.get('title', 'Unknown')}")
+    return metadata
 
-        # Basic episode info
-        episode['title'] = get_element_text(item, 'title')
-        episode['description'] = get_element_text(item, 'description')
-        episode['pub_date'] = get_element_text(item, 'pubDate')
 
-        # Clean and convert pub_date to datetime
-        if episode['pub_date']:
-            try:
-                dt = parse_date(episode['pub_date'])
-                episode['pub_date_iso'] = dt.isoformat() if dt else None
-            except Exception as e:
-                logger.warning(f"Error parsing date for {episode['title']}: {e}")
-                episode['pub_date_iso'] = None
-
-        # Enclosure information (the actual media file)
-        enclosure = item.find('enclosure')
-        if enclosure is not None:
-            episode['media_url'] = enclosure.attrib.get('url')
-            episode['media_length'] = enclosure.attrib.get('length')
-            episode['media_type'] = enclosure.attrib.get('type')
-
-        # iTunes specific metadata
-        episode['duration'] = get_element_text(item, 'itunes:duration', ns)
-        episode['episode_number'] = get_element_text(item, 'itunes:episode', ns)
-        episode['season'] = get_element_text(item, 'itunes:season', ns)
-        episode['explicit'] = get_element_text(item, 'itunes:explicit', ns)
-
-        # Cleanup and convert numeric fields
-        episode['duration_seconds'] = parse_duration(episode['duration'])
-
-        if episode['episode_number']:
-            try:
-                episode['episode_number'] = int(episode['episode_number'])
-            except ValueError:
-                logger.warning(f"Invalid episode number for {episode['title']}")
+def extract_episode(item):
+    """
+    Extract episode details from an RSS feed item
 
-        if episode['season']:
-            try:
-                episode['season'] = int(episode['season'])
-            except ValueError:
-                logger.warning(f"Invalid season number for {episode['title']}")
+    Args:
+        item: XML item element
 
-        # Additional fields
-        episode['guid'] = get_element_text(item, 'guid')
+    Returns:
+        dict: Episode details
+    """
+    # Basic episode info, enclosure (the actual media file) and iTunes specific
+    # metadata in one pass over the item
+    episode = get_child_fields(item, ITEM_FIELDS)
 
-        episodes.append(episode)
+    # Clean and convert pub_date to datetime
+    if episode['pub_date']:
+        try:
+            dt = parse_date(episode['pub_date'])
+            episode['pub_date_iso'] = dt.isoformat() if dt else None
+        except Exception as e:
+            logger.warning(f"Error parsing date for {episode['title']}: {e}")
+            episode['pub_date_iso'] = None
 
-    logger.info(f"Extracted {len(episodes)} episodes")
-    return episodes
+    # Numeric fields (durations, episode and season numbers) stay raw strings here and
+    # are converted for the whole feed at once in create_episode_dataframe
+    return episode
 
 
 def get_element_text(element, tag, namespaces=None, attr=None):
@@ -161,11 +250,36 @@ def parse_date(date_str):
     Returns:
         datetime: Parsed datetime object
     """
+    match = _RFC822.match(date_str)
+    if match:
+        day, month, year, hour, minute, second, zone = match.groups()
+        month = _MONTHS.get(month.title())
+        if month is not None:
+            tzinfo = _parse_offset(zone)
+            if tzinfo is not None or zone is None or zone.upper() in _NAIVE_ZONES:
+                try:
+                    return datetime(int(year), month, int(day), int(hour), int(minute), int(second),
+                                    tzinfo=tzinfo)
+                except ValueError:
+                    pass
+    else:
+        match = _ISO8601.match(date_str)
+        if match:
+            year, month, day, hour, minute, second, fraction, zone = match.groups()
+            try:
+                return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                                int(fraction.ljust(6, '0')) if fraction else 0,
+                                tzinfo=_parse_offset(zone))
+            except ValueError:
+                pass
+
+    # Fall back to strptime for anything the patterns above do not cover
     date_formats = [
         '%a, %d %b %Y %H:%M:%S %z',  # RFC 822 format
         '%a, %d %b %Y %H:%M:%S %Z',  # RFC 822 with timezone name
         '%Y-%m-%dT%H:%M:%S%z',  # ISO 8601
         '%Y-%m-%dT%H:%M:%S.%f%z',  # ISO 8601 with microseconds
+        '%a, %d %b %Y %H:%M:%S',  # RFC 822 without timezone
     ]
 
     for fmt in date_formats:
@@ -174,12 +288,29 @@ def parse_date(date_str):
         except ValueError:
             continue
 
-    # Try without timezone if all else fails
-    try:
-        return datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S')
-    except ValueError:
-        logger.warning(f"Could not parse date: {date_str}")
+    logger.warning(f"Could not parse date: {date_str}")
+    return None
+
+
+def _parse_offset(zone):
+    """
+    Convert a numeric UTC offset ("+0200", "-05:00" or "Z") to a tzinfo
+
+    Args:
+        zone: Offset string, a zone name or None
+
+    Returns:
+        timezone: Fixed-offset timezone, or None if zone is not numeric
+    """
+    if zone is None:
+        return None
+    if zone == 'Z':
+        return timezone.utc
+    if zone[0] not in '+-':
         return None
+    digits = zone[1:].replace(':', '')
+    offset = timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return timezone(-offset if zone[0] == '-' else offset)
 
 
 def parse_duration(duration_str):
@@ -218,29 +349,74 @@ def parse_duration(duration_str):
     return None
 
 
-def create_episode_dataframe(episodes):
+def parse_durations(durations):
     """
-    Convert episode list to DataFrame
+    Vectorized parse_duration over a column of iTunes duration strings
+
+    One regex pass splits every value into hour/minute/second groups and the
+    seconds are summed with integer arithmetic on whole columns.
 
     Args:
-        episodes: List of episode dictionaries
+        durations: pandas.Series of duration strings
 
     Returns:
-        DataFrame: Pandas DataFrame of episodes
+        pandas.Series: Durations in seconds (Int64, <NA> where missing or invalid)
     """
-    df = pd.DataFrame(episodes)
+    parts = durations.astype('string').str.extract(DURATION_RE.pattern).astype('Int64')
+    seconds = parts[0].fillna(0) * 3600 + parts[1].fillna(0) * 60 + parts[2]
 
-    # Set numeric types
-    numeric_cols = ['duration_seconds', 'episode_number', 'season']
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    invalid = durations.notna() & (durations != '') & seconds.isna()
+    if invalid.any():
+        logger.warning(f"Invalid duration format for {int(invalid.sum())} episodes")
+    return seconds
 
-    # Set date types
-    if 'pub_date_iso' in df.columns:
-        df['pub_date_iso'] = pd.to_datetime(df['pub_date_iso'], errors='coerce')
 
-    return df
+def parse_integers(values, label):
+    """
+    Vectorized int() over a column of strings
+
+    Args:
+        values: pandas.Series of integer strings
+        label: Field description used in the invalid-value warning
+
+    Returns:
+        pandas.Series: Parsed values (Int64, <NA> where missing or invalid)
+    """
+    numbers = values.astype('string').str.extract(INTEGER_RE.pattern)[0].astype('Int64')
+
+    invalid = values.notna() & (values != '') & numbers.isna()
+    if invalid.any():
+        logger.warning(f"Invalid {label} for {int(invalid.sum())} episodes")
+    return numbers
+
+
+def create_episode_dataframe(columns):
+    """
+    Convert per-field episode lists to DataFrame
+
+    Each column is built with its final dtype up front, so pandas does not
+    have to infer types over row dicts or re-parse numeric columns.
+
+    Args:
+        columns: Dict mapping each name in EPISODE_COLUMNS (except
+            duration_seconds) to a list of values, one per episode
+
+    Returns:
+        DataFrame: Pandas DataFrame of episodes
+    """
+    data = {}
+    for name in EPISODE_COLUMNS:
+        if name == 'duration_seconds':
+            data[name] = parse_durations(pd.Series(columns['duration'], dtype=object)).array
+        elif name == 'pub_date_iso':
+            data[name] = pd.to_datetime(columns[name], utc=True, format='ISO8601', errors='coerce')
+        elif name in EPISODE_INT_COLUMNS:
+            data[name] = parse_integers(pd.Series(columns[name], dtype=object),
+                                        name.replace('_', ' ')).array
+        else:
+            data[name] = np.asarray(columns[name], dtype=object)
+
+    return pd.DataFrame(data)
 
 
 def parse_rss_feed(xml_path, output_dir):
@@ -261,23 +437,37 @@ def parse_rss_feed(xml_path, output_dir):
         logger.info(f"Created output directory: {output_dir}")
 
     try:
-        # Parse XML
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-
-        # Extract data
-        podcast_metadata = extract_podcast_metadata(root)
-        episodes = extract_episodes(root)
+        # Stream the feed, extracting each episode as soon as it is parsed
+        # and collecting its fields column by column
+        podcast_metadata = None
+        columns = {name: [] for name in EPISODE_COLUMNS if name != 'duration_seconds'}
+        episode_count = 0
+        for elem in iter_feed_elements(xml_path):
+            if elem.tag == 'item':
+                episode = extract_episode(elem)
+                for name, values in columns.items():
+                    values.append(episode.get(name))
+                episode_count += 1
+            elif podcast_metadata is None:
+                podcast_metadata = extract_podcast_metadata(elem)
+
+        if podcast_metadata is None:
+            raise ValueError("Missing channel element in RSS feed")
+        logger.info(f"Extracted {episode_count} episodes")
 
         # Create dataframe
-        episodes_df = create_episode_dataframe(episodes)
+        episodes_df = create_episode_dataframe(columns)
 
         # Save results
         metadata_path = os.path.join(output_dir, 'podcast_metadata.json')
         episodes_path = os.path.join(output_dir, 'episodes.csv')
 
-        with open(metadata_path, 'w') as f:
-            json.dump(podcast_metadata, f, indent=2)
+        if ORJSON_AVAILABLE:
+            with open(metadata_path, 'wb') as f:
+                f.write(orjson.dumps(podcast_metadata, option=orjson.OPT_INDENT_2))
+        else:
+            with open(metadata_path, 'w') as f:
+                json.dump(podcast_metadata, f, indent=2)
 
         episodes_df.to_csv(episodes_path, index=False)
 
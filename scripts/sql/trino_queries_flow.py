@@ -1,12 +1,58 @@
 import trino
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 import argparse
+import atexit
+import functools
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import StringIO
 
-
-def execute_trino_query(host, port, user, catalog, schema, sql_query):
-    # Connect to Trino server
-    conn = trino.dbapi.connect(
+# Optional DFA-based regex engine for the SQL tokenizer
+try:
+    import re2
+
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+
+# Rows pulled from the server per fetch; each chunk becomes one columnar Arrow table
+FETCH_SIZE = 10000
+
+# DataFrames up to this many rows are built directly; the Arrow path only pays off above it
+SMALL_RESULT_ROWS = 1000
+
+# Arrow type for each Trino type whose Python values convert without inference. Types not
+# listed here (decimal, time zones, arrays, maps, rows, ...) are left to pa.array to infer
+_TRINO_TO_ARROW = {
+    "boolean": pa.bool_(),
+    "tinyint": pa.int8(),
+    "smallint": pa.int16(),
+    "integer": pa.int32(),
+    "bigint": pa.int64(),
+    "real": pa.float32(),
+    "double": pa.float64(),
+    "varchar": pa.string(),
+    "char": pa.string(),
+    "varbinary": pa.binary(),
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("us"),
+}
+
+# Type parameters such as the length in varchar(10) or the precision in timestamp(3)
+TYPE_PARAMETERS = re.compile(r"\(.*?\)")
+
+
+def open_conn(host, port, user, catalog, schema):
+    """Open a Trino connection that can serve any number of queries"""
+    return trino.dbapi.connect(
         host=host,
         port=port,
         user=user,
@@ -14,6 +60,45 @@ def execute_trino_query(host, port, user, catalog, schema, sql_query):
         schema=schema
     )
 
+
+# Open connections of each thread keyed by their parameters, and every pooled connection
+# with the thread's dict and key, so closing it also drops it from that thread's pool.
+# Connections are per thread because Trino connections must not be shared between threads
+_thread_conns = threading.local()
+_pooled_conns = []
+
+
+def pooled_conn(host, port, user, catalog, schema):
+    """Return this thread's connection for these parameters, opening it on first use"""
+    conns = getattr(_thread_conns, 'conns', None)
+    if conns is None:
+        conns = _thread_conns.conns = {}
+
+    key = (host, port, user, catalog, schema)
+    conn = conns.get(key)
+    if conn is None:
+        conn = conns[key] = open_conn(host, port, user, catalog, schema)
+        _pooled_conns.append((conns, key, conn))
+    return conn
+
+
+@atexit.register
+def close_pooled_conns():
+    """Close every pooled connection; the next pooled_conn() call in any thread opens a new one"""
+    while _pooled_conns:
+        conns, key, conn = _pooled_conns.pop()
+        conns.pop(key, None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def run_query(conn, sql_query, as_arrow=False):
+    """Run a query on an open connection; returns a DataFrame, or a pyarrow.Table if as_arrow
+
+    Statements without a result set (DDL and the like) return None.
+    """
     # Create a cursor
     cursor = conn.cursor()
 
@@ -22,87 +107,259 @@ def execute_trino_query(host, port, user, catalog, schema, sql_query):
         cursor.execute(sql_query)
 
         # Fetch and process results
-        rows = cursor.fetchall()
-        if cursor.description:
-            column_names = [desc[0] for desc in cursor.description]
-            results_df = pd.DataFrame(rows, columns=column_names)
-        else:
-            results_df = pd.DataFrame()  # For queries that don't return results
+        if as_arrow:
+            return fetch_arrow_table(cursor)
 
-        return results_df
+        rows = cursor.fetchmany(SMALL_RESULT_ROWS + 1)
+        if not cursor.description:
+            return None  # For queries that don't return results
+        if len(rows) <= SMALL_RESULT_ROWS:
+            return pd.DataFrame(rows, columns=[desc[0] for desc in cursor.description])
+
+        table = fetch_arrow_table(cursor, rows=rows)
     finally:
-        # Close the connection
-        conn.close()
+        cursor.close()
+
+    # Convert once, releasing the Arrow buffers as the DataFrame blocks are built
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def execute_trino_query(host, port, user, catalog, schema, sql_query, as_arrow=False):
+    """Run a query and return its result as a DataFrame, or as a pyarrow.Table if as_arrow
+
+    Returns None for statements without a result set. The calling thread's pooled connection for these parameters is reused, so only the
+    first query per thread pays for connecting.
+    """
+    return run_query(pooled_conn(host, port, user, catalog, schema), sql_query, as_arrow=as_arrow)
+
+
+def fetch_arrow_table(cursor, size=FETCH_SIZE, rows=None):
+    """Fetch a cursor's rows chunk by chunk into a pyarrow.Table, without a full list of rows
+
+    rows, if given, are the rows already fetched from the cursor; they become the first chunk.
+    Returns None if the statement has no result set.
+    """
+    if rows is None:
+        rows = cursor.fetchmany(size)
+    if not cursor.description:
+        return None  # For queries that don't return results
+
+    column_names = [desc[0] for desc in cursor.description]
+    column_types = [arrow_type(desc[1]) for desc in cursor.description]
+    chunks = []
+    while True:
+        # Transpose the chunk's rows into columns (empty columns if there are no rows)
+        columns = list(zip(*rows)) or [()] * len(column_names)
+        arrays = [to_arrow_array(column, column_type) for column, column_type in zip(columns, column_types)]
+        chunks.append(pa.Table.from_arrays(arrays, names=column_names))
+        rows = cursor.fetchmany(size)
+        if not rows:
+            break
+
+    # A column that is all null in one chunk gets the type it has in the others
+    return pa.concat_tables(chunks, promote_options="permissive")
+
+
+def arrow_type(type_code):
+    """Return the Arrow type for a Trino type name from cursor.description, or None if unmapped"""
+    if not isinstance(type_code, str):
+        return None
+    return _TRINO_TO_ARROW.get(TYPE_PARAMETERS.sub("", type_code).strip().lower())
+
+
+def to_arrow_array(column, column_type):
+    """Build an Arrow array from a column of Python values, skipping inference when the type is known"""
+    if column_type is not None:
+        try:
+            return pa.array(column, type=column_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # Values that do not fit the declared type; let Arrow infer one instead
+    return pa.array(column)
+
+
+# One token per match: line comment, block comment, quoted string or identifier
+# (quotes escaped by doubling, as in Trino), or a statement-ending semicolon.
+# Compiled with RE2's linear-time automaton when google-re2 is installed
+SQL_TOKEN_PATTERN = r"(?s)--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|;"
+SQL_TOKEN = (re2 if RE2_AVAILABLE else re).compile(SQL_TOKEN_PATTERN)
+
+# Anything that can hide a semicolon from a plain split: a quote or the start of a comment
+SQL_SPECIAL = re.compile(r"['\"]|--|/\*")
+
+# A line break plus the whitespace (including blank lines) on either side of it
+LINE_BREAK = re.compile(r"\s*\n\s*")
+
+# Scripts longer than this are split without caching, to bound the cache's memory
+MAX_CACHED_SQL_LENGTH = 1024 * 1024
 
 
 def split_sql_queries(sql_content):
-    """Split SQL content into individual queries, handling semicolons within strings/comments"""
+    """Split SQL content into individual queries, handling semicolons within strings/comments
+
+    Returns a tuple; results for scripts seen before come from a cache keyed on the content.
+    """
+    if len(sql_content) > MAX_CACHED_SQL_LENGTH:
+        return _split_sql_queries(sql_content)
+    return _split_sql_queries_cached(sql_content)
+
+
+def _split_sql_queries(sql_content):
     queries = []
-    current_query = []
-    in_string = False
-    string_char = None
-    in_comment = False
-
-    for line in sql_content.split('\n'):
-        line = line.strip()
-        if not line:
-            continue
-
-        # Handle comments
-        if line.startswith('--'):
-            continue
-
-        # Process each character in the line
-        i = 0
-        while i < len(line):
-            char = line[i]
-
-            # Handle string literals
-            if char in ("'", '"') and not in_comment:
-                if in_string and char == string_char:
-                    in_string = False
-                    string_char = None
-                elif not in_string:
-                    in_string = True
-                    string_char = char
-
-            # Handle comments
-            elif char == '-' and i + 1 < len(line) and line[i + 1] == '-' and not in_string:
-                in_comment = True
-                break  # skip rest of line
-            elif char == '*' and i + 1 < len(line) and line[i + 1] == '/' and in_string is False:
-                in_comment = False
-                i += 1  # skip next char
-            elif char == '/' and i + 1 < len(line) and line[i + 1] == '*' and in_string is False:
-                in_comment = True
-                i += 1  # skip next char
-
-            # Handle semicolons (query separators)
-            elif char == ';' and not in_string and not in_comment:
-                current_query.append(line[:i])
-                full_query = ' '.join(current_query).strip()
-                if full_query:  # Only add non-empty queries
-                    queries.append(full_query)
-                current_query = []
-                line = line[i + 1:]
-                i = 0
-                continue
 
+    # Without quotes or comments every semicolon ends a statement, so str.split does it all
+    if not SQL_SPECIAL.search(sql_content):
+        for statement in sql_content.split(';'):
+            append_query(queries, [statement])
+        return tuple(queries)
+
+    pieces = []
+    start = 0
+
+    # Walk the tokens in one scan; the text between them is copied through unchanged
+    for match in SQL_TOKEN.finditer(sql_content):
+        pieces.append(sql_content[start:match.start()])
+        start = match.end()
+        token = match.group()
+        if token == ';':
+            append_query(queries, pieces)
+            pieces = []
+        elif token.startswith('/*'):
+            pieces.append(' ')
+        elif not token.startswith('--'):
+            pieces.append(token)
+
+    # Add the last query if there's anything left
+    pieces.append(sql_content[start:])
+    append_query(queries, pieces)
+
+    return tuple(queries)
+
+
+_split_sql_queries_cached = functools.lru_cache(maxsize=32)(_split_sql_queries)
+
+
+def append_query(queries, pieces):
+    """Join a statement's pieces onto one line and add it to queries if non-empty"""
+    # Each line break, with the indentation and blank lines around it, becomes one space
+    full_query = LINE_BREAK.sub(' ', ''.join(pieces)).strip()
+    if full_query:  # Only add non-empty queries
+        queries.append(full_query)
+
+
+# CREATE TABLE ... AS SELECT over an unqualified name, the only statement bundle_ctes folds
+CTAS_QUERY = re.compile(r"^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+AS\s+((?:SELECT|WITH)\b.*)$",
+                        re.IGNORECASE | re.DOTALL)
+
+
+def references(query, table_name):
+    """Whether a query mentions a table name as a whole word"""
+    return re.search(rf"\b{re.escape(table_name)}\b", query, re.IGNORECASE) is not None
+
+
+def bundle_ctes(queries):
+    """Fold chains of CREATE TABLE AS statements feeding a final SELECT into one WITH query
+
+    A chain is a run of CTAS statements where each one reads the table the previous one
+    created, followed by a SELECT that reads the last of them. When none of those tables
+    is used by any later statement, the chain is sent as a single
+    "WITH a AS (...), b AS (...) SELECT ..." query, so Trino plans it as a whole instead
+    of materializing every step. Anything else, including other DDL, is left as it is.
+    """
+    queries = list(queries)
+    bundled = []
+    i = 0
+    while i < len(queries):
+        chain = []
+        j = i
+        while j < len(queries):
+            match = CTAS_QUERY.match(queries[j])
+            if not match or (chain and not references(match.group(2), chain[-1][0])):
+                break
+            chain.append((match.group(1), match.group(2)))
+            j += 1
+
+        final = queries[j] if j < len(queries) else None
+        if (chain and final is not None and re.match(r"SELECT\b", final, re.IGNORECASE)
+                and references(final, chain[-1][0])
+                and not any(references(later, name) for later in queries[j + 1:] for name, _ in chain)):
+            ctes = ", ".join(f"{name} AS ({body})" for name, body in chain)
+            bundled.append(f"WITH {ctes} {final}")
+            i = j + 1
+        else:
+            bundled.append(queries[i])
             i += 1
 
-        if not in_comment:  # If we're not in a comment, add the remaining part of the line
-            current_query.append(line)
+    return bundled
 
-    # Add the last query if there's anything left
-    if current_query and not in_comment:
-        full_query = ' '.join(current_query).strip()
-        if full_query:
-            queries.append(full_query)
 
-    return queries
+# Rows of each result shown on the console
+PREVIEW_ROWS = 10
 
+# Output format implied by the --output file's extension when --format is not given
+OUTPUT_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.csv': 'csv',
+}
 
-def main():
+
+def write_results(table, output_file, output_format, legacy_csv=False):
+    """Write a result table as zstd Parquet, lz4 Feather or CSV
+
+    CSV is written by Arrow's C++ writer; legacy_csv writes it with pandas to_csv instead,
+    matching older outputs exactly (the writers differ in quoting and in how they render
+    floats, nullable integers and timestamps).
+    """
+    if output_format == 'parquet':
+        pq.write_table(table, output_file, compression='zstd')
+    elif output_format == 'feather':
+        feather.write_feather(table, output_file, compression='lz4')
+    elif legacy_csv:
+        table.to_pandas().to_csv(output_file, index=False)
+    else:
+        pacsv.write_csv(table, output_file, write_options=pacsv.WriteOptions(include_header=True))
+
+
+def output_format(output_file, requested=None):
+    """Return the requested output format, or the one the output file's extension implies
+
+    Files without a known extension are written as Parquet.
+    """
+    if requested:
+        return requested
+    extension = os.path.splitext(output_file or '')[1].lower()
+    return OUTPUT_EXTENSIONS.get(extension, 'parquet')
+
+
+def run_all(queries, parallel, execute, report):
+    """Run queries in file order, or parallel at a time, reporting each result as it arrives"""
+    if parallel > 1:
+        # The client waits on the network with the GIL released, so threads overlap the queries
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = {}
+            for i, query in enumerate(queries, 1):
+                print(f"\nSubmitting Query {i}:\n{query}\n")
+                futures[pool.submit(execute, query)] = i
+
+            # Report each query as soon as it finishes
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    report(i, future.result())
+                except Exception as e:
+                    print(f"Error executing Query {i}: {str(e)}")
+    else:
+        # Execute each query in order
+        for i, query in enumerate(queries, 1):
+            print(f"\nExecuting Query {i}:\n{query}\n")
+            try:
+                report(i, execute(query))
+            except Exception as e:
+                print(f"Error executing Query {i}: {str(e)}")
+
+
+def _build_parser():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Execute queries on Trino database')
 
@@ -119,9 +376,34 @@ def main():
     group.add_argument('--query-file', help='File containing SQL query to execute')
 
     # Output options
-    parser.add_argument('--output', help='Output file to save results (CSV format)')
+    parser.add_argument('--output', help='Output file to save results')
+    parser.add_argument('--format', choices=['parquet', 'feather', 'csv'],
+                        help='Format of the output files (default: from the --output extension, '
+                             'otherwise parquet)')
+    parser.add_argument('--legacy-csv', action='store_true',
+                        help='Write CSV output with pandas, byte-for-byte as earlier versions did')
+    parser.add_argument('--echo', action='store_true',
+                        help='Print each result preview as its query finishes, instead of all '
+                             'previews together once every query has run')
+
+    # Execution options
+    parser.add_argument('--parallel', type=int, default=1,
+                        help='Number of queries to run at once; only for independent queries '
+                             '(default: 1, run in file order)')
+    parser.add_argument('--bundle-ctes', action='store_true',
+                        help='Send chains of CREATE TABLE AS statements ending in a SELECT as one '
+                             'WITH query; the intermediate tables are not created')
 
-    args = parser.parse_args()
+    return parser
+
+
+# Built once at import; each main() call only parses
+_PARSER = _build_parser()
+
+
+def main(argv=None):
+    args = _PARSER.parse_args(argv)
+    args.format = output_format(args.output, args.format)
 
     # Read query from file if specified
     if args.query_file:
@@ -131,35 +413,49 @@ def main():
     else:
         queries = [args.query]
 
-    # Execute each query
-    all_results = []
-    for i, query in enumerate(queries, 1):
-        print(f"\nExecuting Query {i}:\n{query}\n")
-        try:
-            results_df = execute_trino_query(
-                host=args.host,
-                port=args.port,
-                user=args.user,
-                catalog=args.catalog,
-                schema=args.schema,
-                sql_query=query
-            )
-
-            # Display results
-            print(f"Results for Query {i}:")
-            print(results_df)
-
-            # Save to file if requested
-            if args.output:
-                output_file = f"{args.output}_{i}.csv" if len(queries) > 1 else args.output
-                results_df.to_csv(output_file, index=False)
-                print(f"Results saved to {output_file}")
-
-            all_results.append(results_df)
-
-        except Exception as e:
-            print(f"Error executing Query {i}: {str(e)}")
-            all_results.append(None)
+    if args.bundle_ctes:
+        bundled = bundle_ctes(queries)
+        if len(bundled) < len(queries):
+            print(f"Bundled {len(queries)} statements into {len(bundled)} queries")
+        queries = bundled
+
+    all_results = [None] * len(queries)
+
+    # Result previews are formatted into one buffer and written in a single call at the end,
+    # unless --echo asks for each to be printed as it arrives
+    previews = sys.stdout if args.echo else StringIO()
+
+    # Each thread reuses its pooled connection for all of its queries
+    def execute(query):
+        return execute_trino_query(args.host, args.port, args.user, args.catalog, args.schema, query,
+                                   as_arrow=True)
+
+    def report(i, results):
+        # Statements without a result set have nothing to show or save
+        if results is None:
+            print(f"Query {i} completed (no result set)")
+            return
+
+        # Display results
+        print(f"Results for Query {i} ({results.num_rows} rows):", file=previews)
+        print(results.slice(0, PREVIEW_ROWS).to_pandas(), file=previews)
+
+        # Save to file if requested
+        if args.output:
+            output_file = f"{args.output}_{i}.{args.format}" if len(queries) > 1 else args.output
+            write_results(results, output_file, args.format, legacy_csv=args.legacy_csv)
+            print(f"Results saved to {output_file}")
+
+        all_results[i - 1] = results
+
+    # Keep each result in Arrow form; it is written without going through pandas
+    try:
+        run_all(queries, args.parallel, execute, report)
+    finally:
+        close_pooled_conns()
+        if not args.echo:
+            sys.stdout.write(previews.getvalue())
+            sys.stdout.flush()
 
 
 if __name__ == '__main__':
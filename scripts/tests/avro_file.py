@@ -1,7 +1,9 @@
 import argparse
 import fastavro
+import mmap
 import os
 
+
 def view_avro(file_path):
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
@@ -9,22 +11,39 @@ def view_avro(file_path):
 
     print(f"Reading Avro file: {file_path}")
 
-    with open(file_path, 'rb') as f:
-        reader = fastavro.reader(f)
-        #schema = reader.schema
-        schema = reader.writer_schema
+    # Memory-map the file and read it block by block: the header gives the schema
+    # and only the blocks holding the first few records are decoded
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        blocks = fastavro.block_reader(mm)
+        schema = blocks.writer_schema
         print("\n Schema:")
         print(schema)
 
         print("\n First few rows:")
-        for i, record in enumerate(reader):
-            print(record)
-            if i == 4:  # limit to 5 rows
+        shown = 0
+        for block in blocks:
+            for record in block:
+                print(record)
+                shown += 1
+                if shown == 5:  # limit to 5 rows
+                    break
+            if shown == 5:
                 break
 
-if __name__ == "__main__":
+
+def _build_parser():
     parser = argparse.ArgumentParser(description="View info about an Avro file")
     parser.add_argument("--file_path", type=str, help="Path to the Avro file")
+    return parser
+
+
+_PARSER = _build_parser()
 
-    args = parser.parse_args()
+
+def main(argv=None):
+    args = _PARSER.parse_args(argv)
     view_avro(args.file_path)
+
+
+if __name__ == "__main__":
+    main()
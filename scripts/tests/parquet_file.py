@@ -1,8 +1,8 @@
-import pandas as pd
 import pyarrow.parquet as pq
 import argparse
 import os
 
+
 def view_parquet(file_path):
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
@@ -10,8 +10,8 @@ def view_parquet(file_path):
 
     print(f" Reading Parquet file: {file_path}")
 
-    # Load metadata
-    parquet_file = pq.ParquetFile(file_path)
+    # Load metadata (memory-mapped, so only the pages that are read get paged in)
+    parquet_file = pq.ParquetFile(file_path, memory_map=True)
 
     print("\nSchema:")
     print(parquet_file.schema)
@@ -22,15 +22,36 @@ def view_parquet(file_path):
 
     print("\n First few rows:")
     try:
-        df = pd.read_parquet(file_path)
-        print(df.head())
+        # Decode only the first rows of the first row group, whatever the size of the file,
+        # and only the first few columns, decoded in parallel, whatever its width
+        preview_cols = parquet_file.schema_arrow.names[:8]
+        first_batch = next(parquet_file.iter_batches(batch_size=5, columns=preview_cols, use_threads=True),
+                           None)
+        if first_batch is None:
+            df = parquet_file.schema_arrow.empty_table().select(preview_cols).to_pandas()
+        else:
+            df = first_batch.to_pandas(split_blocks=True, self_destruct=True)
+        print(df)
+        if len(parquet_file.schema_arrow.names) > len(preview_cols):
+            print(f" (showing the first {len(preview_cols)} columns)")
     except Exception as e:
-        print("️ Could not read full file with Pandas.")
+        print("️ Could not read the file with PyArrow.")
         print("Error:", e)
 
-if __name__ == "__main__":
+
+def _build_parser():
     parser = argparse.ArgumentParser(description="View info about a Parquet file")
     parser.add_argument("--file_path", type=str, help="Path to the Parquet file")
+    return parser
+
+
+_PARSER = _build_parser()
 
-    args = parser.parse_args()
+
+def main(argv=None):
+    args = _PARSER.parse_args(argv)
     view_parquet(args.file_path)
+
+
+if __name__ == "__main__":
+    main()